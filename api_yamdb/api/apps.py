@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from . import checks, signals  # noqa: F401
+        from .db import instrument_connections, reset_health_checks
+
+        instrument_connections()
+        request_started.connect(reset_health_checks)
@@ -0,0 +1,137 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def build_environ(scope, body):
+    """
+    Собирает WSGI environ (PEP 3333) из HTTP scope ASGI и тела запроса.
+    """
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+        environ['REMOTE_PORT'] = str(scope['client'][1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+    return environ
+
+
+def run_wsgi(application, environ):
+    """
+    Выполняет WSGI-приложение в рабочем потоке и возвращает статус,
+    заголовки и тело ответа целиком.
+    """
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ]
+
+    result = application(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], body
+
+
+class AsyncGateway:
+    """
+    ASGI-приложение над WSGI-обработчиком Django 2.2, в котором ещё нет
+    асинхронных представлений. Чтение тела запроса и отправка ответа идут
+    в цикле событий, поэтому медленные клиенты не занимают потоки.
+    Представления и запросы к базе выполняются в пулах потоков: чтения
+    (GET, HEAD, OPTIONS) — в READ_THREADS, записи — в отдельном пуле
+    WRITE_THREADS, чтобы медленные записи не задерживали чтения.
+    """
+    def __init__(self, application, read_threads=None, write_threads=None):
+        self.application = application
+        self.read_executor = ThreadPoolExecutor(
+            read_threads or settings.ASGI['READ_THREADS'],
+            thread_name_prefix='asgi-read',
+        )
+        self.write_executor = ThreadPoolExecutor(
+            write_threads or settings.ASGI['WRITE_THREADS'],
+            thread_name_prefix='asgi-write',
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}.')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_executor.shutdown(wait=False)
+                self.write_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def http(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        executor = (
+            self.read_executor if scope['method'] in SAFE_METHODS
+            else self.write_executor
+        )
+        status, headers, content = await asyncio.get_running_loop(
+        ).run_in_executor(
+            executor, run_wsgi, self.application,
+            build_environ(scope, body)
+        )
+        await send({
+            'type': 'http.response.start', 'status': status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': content})
@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from reviews.models import ADMIN, USER, User
+
+ROLE_CLAIM = 'role'
+IS_STAFF_CLAIM = 'is_staff'
+USER_KEY = 'api:user:{pk}'
+CHANGED_KEY = 'api:user-changed:{pk}'
+
+
+def user_cache():
+    return caches[settings.API_USER_CACHE['ALIAS']]
+
+
+def get_cached_user(pk):
+    """
+    Возвращает пользователя из кэша с коротким временем жизни,
+    обращаясь к базе только при промахе.
+    """
+    key = USER_KEY.format(pk=pk)
+    user = user_cache().get(key)
+    if user is None:
+        user = User.objects.filter(pk=pk).first()
+        if user is not None:
+            user_cache().set(key, user, settings.API_USER_CACHE['TIMEOUT'])
+    return user
+
+
+def invalidate_user(pk):
+    """
+    Удаляет пользователя из кэша и помечает выданные ранее токены как
+    устаревшие: их claims больше не используются до истечения срока.
+    """
+    user_cache().delete(USER_KEY.format(pk=pk))
+    user_cache().set(
+        CHANGED_KEY.format(pk=pk), time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def add_user_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    token[IS_STAFF_CLAIM] = user.is_staff
+    return token
+
+
+class TokenClaimsUser(TokenUser):
+    """
+    Пользователь, восстановленный из claims токена без запроса к базе.
+    Полная модель доступна через instance и загружается из кэша.
+    """
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM, USER)
+
+    def is_admin(self):
+        return self.is_staff or self.role == ADMIN
+
+    @cached_property
+    def instance(self):
+        return get_cached_user(self.pk)
+
+
+class TokenClaimsAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без запроса пользователя к базе: роль и
+    is_staff берутся из claims. Токены без claims и токены, выданные до
+    изменения пользователя, обрабатываются через кэш пользователей.
+    """
+    def get_user(self, validated_token):
+        pk = validated_token.get(api_settings.USER_ID_CLAIM)
+        changed = user_cache().get(CHANGED_KEY.format(pk=pk))
+        if ROLE_CLAIM in validated_token and (
+            changed is None or validated_token['iat'] > changed
+        ):
+            return TokenClaimsUser(validated_token)
+        user = get_cached_user(pk)
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('Пользователь не найден или неактивен.')
+        return user
+
+
+def get_user_instance(user):
+    """
+    Возвращает модель пользователя для запроса в любом режиме
+    аутентификации.
+    """
+    return getattr(user, 'instance', user)
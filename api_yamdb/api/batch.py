@@ -0,0 +1,196 @@
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import bulk_saved
+
+from .serializers import BulkReviewSerializer, BulkTitleSerializer
+
+REVIEW_ALREADY_EXISTS = 'Вы уже оставляли отзыв на это произведение!'
+EXPECTED_LIST = 'Ожидается список объектов.'
+TOO_MANY_ITEMS = 'За один запрос можно передать не больше {limit} объектов.'
+TITLE_NOT_FOUND = 'Произведение с id={pk} не найдено.'
+CATEGORY_NOT_FOUND = 'Категория «{slug}» не найдена.'
+GENRE_NOT_FOUND = 'Жанр «{slug}» не найден.'
+
+
+class BatchResult:
+    """
+    Результаты по каждому объекту запроса в исходном порядке. Ответ
+    имеет статус 201, если созданы все объекты, 400 — если ни одного,
+    и 207 при частичном успехе.
+    """
+    def __init__(self, size):
+        self.items = [None] * size
+
+    def error(self, index, errors):
+        self.items[index] = {
+            'index': index,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'errors': errors,
+        }
+
+    def created(self, index, pk):
+        self.items[index] = {
+            'index': index, 'status': status.HTTP_201_CREATED, 'id': pk,
+        }
+
+    def response(self):
+        created = sum(
+            item['status'] == status.HTTP_201_CREATED for item in self.items
+        )
+        if created == len(self.items):
+            code = status.HTTP_201_CREATED
+        elif created:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response({'results': self.items}, status=code)
+
+
+def non_field_error(message):
+    return {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+
+
+def validate_items(data, serializer_class):
+    """
+    Проверяет поля каждого объекта без обращений к базе. Возвращает
+    результат с ошибками и словарь индекс -> проверенные данные.
+    """
+    if not isinstance(data, list):
+        raise ValidationError(non_field_error(EXPECTED_LIST))
+    limit = settings.BULK_WRITE['MAX_ITEMS']
+    if len(data) > limit:
+        raise ValidationError(
+            non_field_error(TOO_MANY_ITEMS.format(limit=limit))
+        )
+    result = BatchResult(len(data))
+    valid = {}
+    for index, item in enumerate(data):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            result.error(index, serializer.errors)
+    return result, valid
+
+
+def create_reviews(author, data):
+    """
+    Создаёт отзывы автора на разные произведения. Существование
+    произведений и прежних отзывов проверяется двумя запросами на весь
+    пакет, рейтинги пересчитываются одним UPDATE.
+    """
+    result, valid = validate_items(data, BulkReviewSerializer)
+    reviews = build_reviews(author, valid, result)
+    if reviews:
+        insert_reviews(author, reviews, result)
+    return result
+
+
+def build_reviews(author, valid, result):
+    title_ids = {item['title'] for item in valid.values()}
+    titles = set(
+        Title.objects.filter(pk__in=title_ids).values_list('pk', flat=True)
+    )
+    reviewed = set(Review.objects.filter(
+        author=author, title_id__in=title_ids
+    ).values_list('title_id', flat=True))
+    reviews = {}
+    for index, item in valid.items():
+        title_id = item['title']
+        if title_id not in titles:
+            result.error(index, {
+                'title': [TITLE_NOT_FOUND.format(pk=title_id)]
+            })
+        elif title_id in reviewed:
+            result.error(index, non_field_error(REVIEW_ALREADY_EXISTS))
+        else:
+            reviewed.add(title_id)
+            reviews[index] = Review(
+                author=author, title_id=title_id,
+                text=item['text'], score=item['score'],
+            )
+    return reviews
+
+
+def insert_reviews(author, reviews, result):
+    title_ids = {review.title_id for review in reviews.values()}
+    try:
+        with transaction.atomic():
+            Review.objects.bulk_create(reviews.values())
+            Title.objects.filter(pk__in=title_ids).refresh_rating()
+    except IntegrityError:
+        # Параллельный запрос того же автора успел создать отзыв.
+        for index in reviews:
+            result.error(index, non_field_error(REVIEW_ALREADY_EXISTS))
+        return
+    if any(review.pk is None for review in reviews.values()):
+        ids = dict(Review.objects.filter(
+            author=author, title_id__in=title_ids
+        ).values_list('title_id', 'pk'))
+        for review in reviews.values():
+            review.pk = ids[review.title_id]
+    for index, review in reviews.items():
+        result.created(index, review.pk)
+    bulk_saved.send(sender=Review, instances=list(reviews.values()))
+
+
+def create_titles(data):
+    """
+    Создаёт произведения. Категории и жанры всего пакета загружаются
+    двумя запросами, связи с жанрами вставляются одним bulk_create.
+    """
+    result, valid = validate_items(data, BulkTitleSerializer)
+    categories = dict(Category.objects.filter(
+        slug__in={item['category'] for item in valid.values()}
+    ).values_list('slug', 'pk'))
+    genres = dict(Genre.objects.filter(slug__in={
+        slug for item in valid.values() for slug in item['genre']
+    }).values_list('slug', 'pk'))
+    titles = {}
+    for index, item in valid.items():
+        errors = {}
+        if item['category'] not in categories:
+            errors['category'] = [
+                CATEGORY_NOT_FOUND.format(slug=item['category'])
+            ]
+        missing = [slug for slug in item['genre'] if slug not in genres]
+        if missing:
+            errors['genre'] = [
+                GENRE_NOT_FOUND.format(slug=slug) for slug in missing
+            ]
+        if errors:
+            result.error(index, errors)
+            continue
+        titles[index] = (
+            Title(
+                name=item['name'], year=item['year'],
+                description=item.get('description'),
+                category_id=categories[item['category']],
+            ),
+            {genres[slug] for slug in item['genre']},
+        )
+    if not titles:
+        return result
+    instances = [title for title, _ in titles.values()]
+    features = connections[Title.objects.db].features
+    with transaction.atomic():
+        # SQLite не возвращает id из bulk_create, а они нужны для жанров.
+        if features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(instances)
+        else:
+            for title in instances:
+                title.save()
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre_id)
+            for title, genre_ids in titles.values()
+            for genre_id in genre_ids
+        )
+    for index, (title, _) in titles.items():
+        result.created(index, title.pk)
+    bulk_saved.send(sender=Title, instances=instances)
+    return result
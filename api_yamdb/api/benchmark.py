@@ -0,0 +1,354 @@
+import io
+import json
+import math
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.bulk import batches, preserve_auto_now
+from reviews.models import Category, Genre, Review, Title, User
+
+from .authentication import add_user_claims
+from .cache import response_cache
+from .models import CollectionVersion, ConfirmationCode, OutgoingEmail
+from .renderers import FastJSONParser, FastJSONRenderer, orjson
+from .serializers import ReadTitleSerializer
+from .views import TitleViewSet
+
+PREFIX = 'bench'
+CATEGORIES = 10
+GENRES = 20
+GENRES_PER_TITLE = 2
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def create_in_batches(model, objects, batch_size):
+    for batch in batches(objects, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+
+
+def generate_dataset(titles, reviews, users, batch_size=5000, seed=0):
+    """
+    Добавляет в базу синтетические данные: titles произведений и reviews
+    отзывов, равномерно распределённых по произведениям. Первичные ключи
+    задаются явно, поэтому генерация одинакова на SQLite и PostgreSQL.
+    """
+    rng = random.Random(seed)
+    run = next_pk(User)
+    categories = [
+        Category.objects.get_or_create(
+            slug=f'{PREFIX}-category-{index}',
+            defaults={'name': f'Категория {index}'}
+        )[0].pk
+        for index in range(CATEGORIES)
+    ]
+    genres = [
+        Genre.objects.get_or_create(
+            slug=f'{PREFIX}-genre-{index}',
+            defaults={'name': f'Жанр {index}'}
+        )[0].pk
+        for index in range(GENRES)
+    ]
+    per_title = math.ceil(reviews / titles) if titles else 0
+    users = max(users, per_title, 1)
+    password = make_password(None)
+    user_ids = list(range(run, run + users))
+    create_in_batches(User, (
+        User(
+            pk=pk, username=f'{PREFIX}-{pk}',
+            email=f'{PREFIX}-{pk}@yamdb.fake', password=password,
+        )
+        for pk in user_ids
+    ), batch_size)
+    first_title = next_pk(Title)
+    title_ids = list(range(first_title, first_title + titles))
+    this_year = timezone.now().year
+    create_in_batches(Title, (
+        Title(
+            pk=pk, name=f'Произведение {pk}',
+            year=rng.randint(this_year - 100, this_year),
+            description=f'Описание произведения {pk}',
+            category_id=rng.choice(categories),
+        )
+        for pk in title_ids
+    ), batch_size)
+    create_in_batches(Title.genre.through, (
+        Title.genre.through(title_id=pk, genre_id=genre_id)
+        for pk in title_ids
+        for genre_id in rng.sample(genres, GENRES_PER_TITLE)
+    ), batch_size)
+    now = timezone.now()
+    with preserve_auto_now(Review):
+        create_in_batches(Review, (
+            Review(
+                title_id=title_id, author_id=user_ids[
+                    (position + index) % users
+                ],
+                text=f'Отзыв {index}', score=rng.randint(1, 10),
+                pub_date=now - timedelta(minutes=rng.randint(0, 10 ** 6)),
+            )
+            for position, title_id in enumerate(title_ids)
+            for index in range(
+                reviews // titles + (position < reviews % titles)
+            )
+        ), batch_size)
+    Title.objects.filter(pk__gte=first_title).refresh_rating()
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [User, Title, Review]
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+    response_cache.clear()
+    CollectionVersion.objects.bump(['titles', 'users'])
+
+
+class TestClientTransport:
+    """
+    Выполняет запросы в процессе через тестовый клиент Django.
+    """
+    name = 'test-client'
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {}
+        if token:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        response = self.client.generic(
+            method, path, json.dumps(data) if data is not None else '',
+            content_type='application/json', **headers
+        )
+        return response.status_code, response
+
+
+class HttpTransport:
+    """
+    Выполняет запросы к запущенному серверу, например gunicorn.
+    """
+    def __init__(self, base_url):
+        self.name = base_url
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        request = urllib.request.Request(
+            self.base_url + path, method=method, headers=headers,
+            data=json.dumps(data).encode() if data is not None else None,
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code, error.headers
+
+
+def access_token(user):
+    return str(add_user_claims(RefreshToken.for_user(user), user).access_token)
+
+
+def percentile(ordered, rank):
+    index = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return round(ordered[index] * 1000, 2)
+
+
+def summarize(latencies, queries, errors, cache_hits, elapsed):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput': round(len(ordered) / elapsed, 1),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'queries_mean': (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+        'queries_max': max(queries, default=None),
+        'cache_hits': cache_hits,
+    }
+
+
+class Benchmark:
+    """
+    Прогоняет сценарии горячих путей API и собирает задержки, пропускную
+    способность и число SQL-запросов (из заголовка Server-Timing).
+    Созданные сценариями пользователи, отзывы и письма удаляются в конце.
+    При concurrency > 1 запросы сценария отправляются параллельно из
+    стольких же потоков.
+    """
+    scenarios = (
+        'title_list', 'title_filter', 'review_list', 'review_create',
+        'signup', 'token',
+    )
+
+    def __init__(self, transport, requests, seed=0, concurrency=1):
+        self.transport = transport
+        self.requests = requests
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.run = f'{PREFIX}-run-{int(time.time())}-{seed}'
+        self.title_ids = list(Title.objects.values_list('pk', flat=True))
+        if not self.title_ids:
+            raise ValueError('В базе нет произведений для бенчмарка.')
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.years = list(
+            Title.objects.values_list('year', flat=True).distinct()
+        )
+
+    def run_all(self, names=None):
+        try:
+            return {
+                name: self.measure(name)
+                for name in names or self.scenarios
+            }
+        finally:
+            User.objects.filter(username__startswith=self.run).delete()
+            OutgoingEmail.objects.filter(
+                recipient__startswith=self.run
+            ).delete()
+
+    def send(self, request):
+        method, path, data, token, expected = request
+        started = time.perf_counter()
+        status, headers = self.transport.request(method, path, data, token)
+        match = QUERIES_PATTERN.search(headers.get('Server-Timing', ''))
+        return (
+            time.perf_counter() - started, status != expected,
+            headers.get('X-Cache') == 'HIT',
+            int(match.group(1)) if match else None,
+        )
+
+    def measure(self, name):
+        response_cache.clear()
+        prepare = getattr(self, f'prepare_{name}', None)
+        state = prepare() if prepare else None
+        scenario = getattr(self, name)
+        requests = [scenario(index, state) for index in range(self.requests)]
+        started = time.perf_counter()
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(self.concurrency) as executor:
+                results = list(executor.map(self.send, requests))
+        else:
+            results = [self.send(request) for request in requests]
+        elapsed = time.perf_counter() - started
+        latencies, errors, hits, queries = zip(*results)
+        return summarize(
+            latencies, [count for count in queries if count is not None],
+            sum(errors), sum(hits), elapsed
+        )
+
+    def create_users(self, count, role='user'):
+        return [
+            User.objects.create(
+                username=f'{self.run}-{role}-{index}',
+                email=f'{self.run}-{role}-{index}@yamdb.fake',
+            )
+            for index in range(count)
+        ]
+
+    def title_list(self, index, state):
+        pages = max(1, min(100, len(self.title_ids) // 10))
+        page = self.rng.randint(1, pages)
+        return 'GET', f'/api/v1/titles/?page={page}', None, None, 200
+
+    def title_filter(self, index, state):
+        params = f'year={self.rng.choice(self.years)}'
+        if self.genres:
+            params += f'&genre={self.rng.choice(self.genres)}'
+        return 'GET', f'/api/v1/titles/?{params}', None, None, 200
+
+    def review_list(self, index, state):
+        title_id = self.rng.choice(self.title_ids)
+        path = f'/api/v1/titles/{title_id}/reviews/'
+        return 'GET', path, None, None, 200
+
+    def prepare_review_create(self):
+        writers = self.create_users(
+            math.ceil(self.requests / len(self.title_ids)), role='writer'
+        )
+        return [access_token(writer) for writer in writers]
+
+    def review_create(self, index, state):
+        title_id = self.title_ids[index % len(self.title_ids)]
+        token = state[index // len(self.title_ids)]
+        data = {'text': 'Отзыв бенчмарка', 'score': self.rng.randint(1, 10)}
+        path = f'/api/v1/titles/{title_id}/reviews/'
+        return 'POST', path, data, token, 201
+
+    def signup(self, index, state):
+        data = {
+            'username': f'{self.run}-signup-{index}',
+            'email': f'{self.run}-signup-{index}@yamdb.fake',
+        }
+        return 'POST', '/api/v1/auth/signup/', data, None, 200
+
+    def prepare_token(self):
+        return [
+            (user.username, ConfirmationCode.objects.issue(user))
+            for user in self.create_users(self.requests, role='token')
+        ]
+
+    def token(self, index, state):
+        username, code = state[index]
+        data = {'username': username, 'confirmation_code': code}
+        return 'POST', '/api/v1/auth/token/', data, None, 200
+
+
+def compare_json_backends(titles, rounds):
+    """
+    Сравнивает JSONRenderer/JSONParser DRF с FastJSONRenderer/
+    FastJSONParser на странице ReadTitleSerializer из titles произведений.
+    """
+    queryset = TitleViewSet.queryset.all()[:titles]
+    data = {'results': ReadTitleSerializer(queryset, many=True).data}
+    backends = {
+        'default': (JSONRenderer(), JSONParser()),
+        'fast': (FastJSONRenderer(), FastJSONParser()),
+    }
+    report = {'titles': len(data['results']), 'orjson': orjson is not None}
+    for name, (renderer, parser) in backends.items():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            content = renderer.render(data)
+        rendered = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(rounds):
+            parser.parse(io.BytesIO(content))
+        parsed = time.perf_counter() - started
+        report[name] = {
+            'bytes': len(content),
+            'render_ms': round(rendered / rounds * 1000, 3),
+            'parse_ms': round(parsed / rounds * 1000, 3),
+        }
+    report['render_speedup'] = round(
+        report['default']['render_ms'] / report['fast']['render_ms'], 2
+    )
+    report['parse_speedup'] = round(
+        report['default']['parse_ms'] / report['fast']['parse_ms'], 2
+    )
+    return report
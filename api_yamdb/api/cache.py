@@ -0,0 +1,207 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+from .replicas import is_pinned
+
+ANONYMOUS = 'anonymous'
+
+
+class BaseCacheBackend:
+    """
+    Хранилище кэша ответов со счётчиками поколений и попаданий.
+    """
+    def __init__(self, timeout=60, **options):
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def get_generations(self, names):
+        raise NotImplementedError
+
+    def bump_generation(self, name):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class LRUCacheBackend(BaseCacheBackend):
+    """
+    Кэш в памяти процесса с вытеснением LRU и временем жизни записей.
+    Поколения тоже локальны для процесса, поэтому при нескольких
+    воркерах чужие изменения видны не позже чем через timeout секунд.
+    """
+    def __init__(self, timeout=60, max_entries=1024, **options):
+        super().__init__(timeout=timeout)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_generations(self, names):
+        return [self._generations.get(name, 0) for name in names]
+
+    def bump_generation(self, name):
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend(BaseCacheBackend):
+    """
+    Общий для всех процессов кэш поверх настроенного в CACHES хранилища.
+    """
+    generation_prefix = 'api:generation:'
+
+    def __init__(self, timeout=60, alias='default', **options):
+        super().__init__(timeout=timeout)
+        self.cache = caches[alias]
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def get_generations(self, names):
+        keys = [self.generation_prefix + name for name in names]
+        values = self.cache.get_many(keys)
+        return [values.get(key, 0) for key in keys]
+
+    def bump_generation(self, name):
+        key = self.generation_prefix + name
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _load_backend():
+    options = {
+        key.lower(): value
+        for key, value in settings.API_RESPONSE_CACHE.items()
+    }
+    return import_string(options.pop('backend'))(**options)
+
+
+response_cache = SimpleLazyObject(_load_backend)
+
+
+def plain_copy(data):
+    """
+    Копия данных ответа из обычных dict и list. ReturnDict и ReturnList
+    держат ссылку на сериализатор, а через него — на запрос и объекты
+    модели, которые иначе жили бы в кэше вместе с записью.
+    """
+    if isinstance(data, dict):
+        return {key: plain_copy(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [plain_copy(value) for value in data]
+    return data
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+    if user.is_admin():
+        return 'admin'
+    return user.role
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы на GET-запросы. Ключ строится из пути, параметров
+    запроса (включая страницу), роли пользователя и поколений моделей
+    из cache_models: любое изменение этих моделей делает старые записи
+    недостижимыми. Пользователь, закреплённый за основной базой после
+    записи, кэш не использует: запись могла быть заполнена из
+    отстающей реплики.
+    """
+    cache_models = ()
+
+    def get_cache_key(self, request):
+        names = [model._meta.label_lower for model in self.cache_models]
+        generations = response_cache.get_generations(names)
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(
+            f'{request.build_absolute_uri(request.path)}?{query}'.encode()
+        ).hexdigest()
+        return ':'.join((
+            'api', self.basename,
+            '.'.join(str(generation) for generation in generations),
+            get_role(request.user), digest,
+        ))
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if is_pinned(request.user):
+            response = handler(request, *args, **kwargs)
+            response['X-Cache'] = 'BYPASS'
+            return response
+        key = self.get_cache_key(request)
+        cached = response_cache.get(key)
+        if cached is not None:
+            response = Response(cached)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, plain_copy(response.data))
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedListMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
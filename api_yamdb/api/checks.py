@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+TOKEN_CLAIMS_AUTHENTICATION = 'api.authentication.TokenClaimsAuthentication'
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+@register()
+def check_user_cache(app_configs, **kwargs):
+    """
+    TokenClaimsAuthentication доверяет роли из токена, пока в кэше нет
+    метки изменения пользователя. В кэше отдельного процесса метка не
+    видна другим воркерам, и понижение роли не действует в них до
+    истечения токена.
+    """
+    authentication = settings.REST_FRAMEWORK.get(
+        'DEFAULT_AUTHENTICATION_CLASSES', ()
+    )
+    if (TOKEN_CLAIMS_AUTHENTICATION not in authentication
+            or not is_process_local(settings.API_USER_CACHE['ALIAS'])):
+        return []
+    return [Error(
+        'TokenClaimsAuthentication требует общего для всех воркеров кэша.',
+        hint=(
+            'Укажите в CACHE_BACKEND и CACHE_LOCATION memcached или '
+            'другой общий кэш либо отключите JWT_STATELESS_USER.'
+        ),
+        id='api.E001',
+    )]
+
+
+@register()
+def check_replica_pin_cache(app_configs, **kwargs):
+    """
+    Закрепление чтений за основной базой после записи хранится в кэше
+    CACHE_ALIAS. В кэше отдельного процесса его не видят другие
+    воркеры, и следующий запрос может не найти только что записанное.
+    """
+    replication = settings.DATABASE_REPLICATION
+    if (not replication['REPLICAS']
+            or not is_process_local(replication['CACHE_ALIAS'])):
+        return []
+    return [Error(
+        'Чтение из реплик требует общего для всех воркеров кэша.',
+        hint=(
+            'Укажите в CACHE_BACKEND и CACHE_LOCATION memcached или '
+            'другой общий кэш либо не задавайте DB_REPLICA_HOSTS.'
+        ),
+        id='api.E002',
+    )]
@@ -0,0 +1,112 @@
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'application/yaml', 'application/x-yaml',
+    'image/svg+xml',
+)
+STATIC_EXTENSIONS = (
+    '.css', '.js', '.json', '.html', '.txt', '.svg', '.xml', '.yaml',
+    '.yml', '.map',
+)
+
+
+def available_encodings():
+    """
+    Кодировки в порядке предпочтения сервера: brotli сжимает JSON
+    сильнее gzip, но доступен только с установленным пакетом brotli.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    """
+    Возвращает словарь {кодировка: q} из заголовка Accept-Encoding.
+    """
+    weights = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+def choose_encoding(header):
+    """
+    Выбирает кодировку ответа по Accept-Encoding: с наибольшим q, при
+    равных q — в порядке available_encodings(). None — сжимать нельзя.
+    """
+    weights = parse_accept_encoding(header or '')
+    candidates = [
+        (weights.get(encoding, weights.get('*', 0.0)), -position, encoding)
+        for position, encoding in enumerate(available_encodings())
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def compress(content, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=11 if level is None else level
+        )
+    return gzip.compress(content, 9 if level is None else level, mtime=0)
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressedStaticFilesStorage(StaticFilesStorage):
+    """
+    После collectstatic кладёт рядом с текстовыми статическими файлами
+    сжатые копии .gz и .br (если установлен brotli), которые nginx
+    отдаёт напрямую, не сжимая файлы на каждый запрос. Файлы меньше
+    COMPRESSION['MIN_SIZE'] и плохо сжимающиеся не дублируются.
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(paths):
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            for compressed in self.compress_file(name):
+                yield name, compressed, True
+
+    def compress_file(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.COMPRESSION['MIN_SIZE']:
+            return
+        for encoding in available_encodings():
+            extension = '.br' if encoding == 'br' else '.gz'
+            compressed = compress(content, encoding)
+            target = name + extension
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(target):
+                self.delete(target)
+            yield self.save(target, ContentFile(compressed))
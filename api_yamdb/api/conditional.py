@@ -0,0 +1,116 @@
+import hashlib
+
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .cache import get_role
+from .models import CollectionVersion
+
+PRECONDITION_FAILED = 'Ресурс был изменён после получения ETag.'
+
+
+def etag_matches(etag, header):
+    """
+    Сравнивает ETag без учёта префикса W/: CompressionMiddleware ослабляет
+    ETag сжатых ответов, а валидатор строится по версиям коллекций и от
+    кодирования тела не зависит.
+    """
+    etags = {value[2:] if value.startswith('W/') else value
+             for value in parse_etags(header)}
+    return '*' in etags or etag in etags
+
+
+class NotModifiedError(Exception):
+    pass
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = PRECONDITION_FAILED
+    default_code = 'precondition_failed'
+
+
+class ConditionalRequestMixin:
+    """
+    Выдаёт ETag и Last-Modified по счётчикам изменений коллекций из
+    etag_collections, не сериализуя ответ: валидаторы вычисляются одним
+    запросом к CollectionVersion. Отвечает 304 на совпавшие
+    If-None-Match/If-Modified-Since и 412 на несовпавший If-Match
+    при изменении и удалении.
+    """
+    etag_collections = ()
+
+    def get_validators(self, request):
+        keys = [key.format(**self.kwargs) for key in self.etag_collections]
+        versions = {
+            item.key: item for item in CollectionVersion.objects.filter(
+                key__in=keys
+            )
+        }
+        state = ':'.join(
+            f'{key}={versions[key].version if key in versions else 0}'
+            for key in keys
+        )
+        variant = ':'.join((
+            request.get_full_path(), get_role(request.user),
+            request.accepted_media_type or '',
+        ))
+        etag = quote_etag(
+            hashlib.md5(f'{state}|{variant}'.encode()).hexdigest()
+        )
+        modified = max(
+            (item.modified for item in versions.values()), default=None
+        )
+        return etag, modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.etag_collections:
+            return
+        self.etag, self.last_modified = self.get_validators(request)
+        headers = request.META
+        if request.method in SAFE_METHODS:
+            if_none_match = headers.get('HTTP_IF_NONE_MATCH')
+            if if_none_match is not None:
+                if etag_matches(self.etag, if_none_match):
+                    raise NotModifiedError
+                return
+            since = parse_http_date_safe(
+                headers.get('HTTP_IF_MODIFIED_SINCE', '')
+            )
+            if (since is not None and self.last_modified is not None
+                    and int(self.last_modified.timestamp()) <= since):
+                raise NotModifiedError
+            return
+        if_match = headers.get('HTTP_IF_MATCH')
+        if if_match is not None:
+            if not etag_matches(self.etag, if_match):
+                raise PreconditionFailed
+
+    def set_validators(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(
+                self.last_modified.timestamp()
+            )
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModifiedError):
+            return self.set_validators(
+                Response(status=status.HTTP_304_NOT_MODIFIED)
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (request.method in SAFE_METHODS and response.status_code == 200
+                and getattr(self, 'etag', None)):
+            self.set_validators(response)
+        return response
@@ -0,0 +1,44 @@
+import time
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from .metrics import current
+
+_ensure_connection = BaseDatabaseWrapper.ensure_connection
+
+
+def reset_health_checks(**kwargs):
+    """
+    В начале запроса помечает постоянные соединения как непроверенные.
+    """
+    for connection in connections.all():
+        connection.health_check_done = False
+
+
+def _checked_ensure_connection(self):
+    """
+    Перед первым использованием постоянного соединения в запросе
+    проверяет, что оно живо (CONN_HEALTH_CHECKS, как в Django 4.1), и
+    переподключается, если база или pgbouncer его закрыли. Время
+    проверки и подключения учитывается как ожидание соединения.
+    """
+    if (self.connection is not None
+            and getattr(self, 'health_check_done', True)):
+        return
+    started = time.perf_counter()
+    if (self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not self.in_atomic_block and not self.is_usable()):
+        self.close()
+    self.health_check_done = True
+    opened = self.connection is None
+    _ensure_connection(self)
+    metrics = current()
+    if metrics is not None:
+        metrics.connection_wait += time.perf_counter() - started
+        metrics.connections_opened += opened
+
+
+def instrument_connections():
+    BaseDatabaseWrapper.ensure_connection = _checked_ensure_connection
@@ -8,11 +8,20 @@ class TitleFilter(fl.FilterSet):
                           lookup_expr='contains')
     genre = CharFilter(field_name='genre__slug',
                        lookup_expr='contains')
+    category_exact = CharFilter(field_name='category__slug',
+                                lookup_expr='exact')
+    genre_exact = CharFilter(field_name='genre__slug',
+                             lookup_expr='exact')
     name = CharFilter(field_name='name',
                       lookup_expr='contains')
     year = NumberFilter(field_name='year',
                         lookup_expr='exact')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'genre', 'category']
+        fields = ['name', 'year', 'genre', 'category', 'genre_exact',
+                  'category_exact', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
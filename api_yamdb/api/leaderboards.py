@@ -0,0 +1,245 @@
+import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, FloatField, Sum, Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+from reviews.models import Category, Genre, Review, Title
+
+from .models import (ALL, CATEGORY, GENRE, TOP, TRENDING, CollectionVersion,
+                     TitleRanking)
+
+# Дата изменения этой коллекции — начало последнего пересчёта рейтингов,
+# а её счётчик входит в ETag ответов с рейтингами.
+REFRESHED_KEY = 'leaderboards'
+TITLE_KEY_PREFIX = 'title:'
+TITLE_KEY_SUFFIX = ':reviews'
+
+
+def leaderboards():
+    return settings.LEADERBOARDS
+
+
+def bayesian_score(score_sum, review_count, mean):
+    """
+    Байесовское среднее: PRIOR_WEIGHT воображаемых отзывов со средней
+    оценкой mean тянут к ней оценку произведений с малым числом отзывов.
+    """
+    prior = leaderboards()['PRIOR_WEIGHT']
+    return (prior * mean + score_sum) / (prior + review_count)
+
+
+def title_scope_filter(scope, scope_id):
+    if scope == CATEGORY:
+        return {'category_id': scope_id}
+    if scope == GENRE:
+        return {'genre': scope_id}
+    return {}
+
+
+def top_rows(scope, scope_id, mean):
+    """
+    Лучшие SIZE произведений области по байесовской оценке из сохранённых
+    суммы оценок и числа отзывов; сортировка выполняется в базе.
+    """
+    prior = leaderboards()['PRIOR_WEIGHT']
+    score = ExpressionWrapper(
+        (Value(prior * mean, output_field=FloatField())
+         + Cast('score_sum', FloatField()))
+        / (Value(prior, output_field=FloatField())
+           + Cast('review_count', FloatField())),
+        output_field=FloatField(),
+    )
+    return list(
+        Title.objects.filter(
+            review_count__gt=0, **title_scope_filter(scope, scope_id)
+        ).annotate(bayesian=score).order_by(
+            '-bayesian', 'pk'
+        ).values_list('pk', 'bayesian', 'review_count')[
+            :leaderboards()['SIZE']
+        ]
+    )
+
+
+def replace_rankings(board, scope, scope_id, rows):
+    """
+    Заменяет рейтинг области в одной транзакции: читатели видят либо
+    прежний, либо новый рейтинг целиком.
+    """
+    with transaction.atomic():
+        TitleRanking.objects.filter(
+            board=board, scope=scope, scope_id=scope_id
+        ).delete()
+        TitleRanking.objects.bulk_create([
+            TitleRanking(
+                board=board, scope=scope, scope_id=scope_id,
+                position=position, title_id=title_id, score=score,
+                review_count=review_count,
+            )
+            for position, (title_id, score, review_count)
+            in enumerate(rows, 1)
+        ])
+
+
+def all_scopes():
+    return (
+        {(ALL, 0)}
+        | {(CATEGORY, pk) for pk in Category.objects.values_list(
+            'pk', flat=True
+        )}
+        | {(GENRE, pk) for pk in Genre.objects.values_list('pk', flat=True)}
+    )
+
+
+def changed_titles(since):
+    """
+    Произведения, у которых после since менялись отзывы, категория или
+    жанры, по датам изменения коллекций title:{pk}:reviews.
+    """
+    keys = CollectionVersion.objects.filter(
+        modified__gt=since, key__startswith=TITLE_KEY_PREFIX,
+        key__endswith=TITLE_KEY_SUFFIX,
+    ).values_list('key', flat=True)
+    return {
+        int(key[len(TITLE_KEY_PREFIX):-len(TITLE_KEY_SUFFIX)])
+        for key in keys
+    }
+
+
+def affected_scopes(title_ids):
+    """
+    Области, в которые изменённые произведения входят сейчас или в
+    рейтингах которых они стоят: общий рейтинг, их категории и жанры.
+    """
+    scopes = {(ALL, 0)}
+    scopes.update(
+        (CATEGORY, pk) for pk in Title.objects.filter(
+            pk__in=title_ids, category__isnull=False
+        ).values_list('category_id', flat=True)
+    )
+    scopes.update(
+        (GENRE, pk) for pk in Title.genre.through.objects.filter(
+            title_id__in=title_ids
+        ).values_list('genre_id', flat=True)
+    )
+    scopes.update(
+        TitleRanking.objects.filter(
+            board=TOP, title_id__in=title_ids
+        ).values_list('scope', 'scope_id')
+    )
+    return scopes
+
+
+def refresh_top(since=None):
+    """
+    Пересчитывает рейтинг лучших произведений в областях, затронутых
+    изменениями после since, или во всех областях, если since не задан.
+    Средняя оценка по всем произведениям берётся свежая, поэтому в
+    незатронутых областях она немного отстаёт до полного пересчёта.
+    """
+    if since is None:
+        scopes = all_scopes()
+        stale = set(TitleRanking.objects.filter(board=TOP).values_list(
+            'scope', 'scope_id'
+        ).distinct()) - scopes
+        for scope, scope_id in stale:
+            replace_rankings(TOP, scope, scope_id, [])
+    else:
+        title_ids = changed_titles(since)
+        if not title_ids:
+            return 0
+        scopes = affected_scopes(title_ids)
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count')
+    )
+    mean = (
+        totals['score_sum'] / totals['review_count']
+        if totals['review_count'] else 0.0
+    )
+    for scope, scope_id in scopes:
+        replace_rankings(TOP, scope, scope_id, top_rows(scope, scope_id, mean))
+    return len(scopes)
+
+
+def trending_scores(since):
+    """
+    Байесовские оценки по отзывам, опубликованным после since, с их
+    собственным средним в качестве априорного: (оценка, число отзывов)
+    для каждого произведения.
+    """
+    window = Review.objects.filter(pub_date__gte=since).order_by()
+    totals = {
+        title_id: (score_sum, review_count)
+        for title_id, score_sum, review_count in window.values(
+            'title_id'
+        ).annotate(
+            score_sum=Sum('score'), review_count=Count('pk')
+        ).values_list('title_id', 'score_sum', 'review_count')
+    }
+    review_count = sum(count for _, count in totals.values())
+    if not review_count:
+        return {}
+    mean = sum(score_sum for score_sum, _ in totals.values()) / review_count
+    return {
+        title_id: (bayesian_score(score_sum, count, mean), count)
+        for title_id, (score_sum, count) in totals.items()
+    }
+
+
+def refresh_trending(now):
+    """
+    Пересчитывает рейтинг популярных за TRENDING_DAYS дней: окно
+    сдвигается со временем, поэтому рейтинг строится заново, но только
+    по отзывам из окна.
+    """
+    since = now - dt.timedelta(days=leaderboards()['TRENDING_DAYS'])
+    scores = trending_scores(since)
+    members = defaultdict(list)
+    members[(ALL, 0)] = list(scores)
+    for title_id, category_id in Title.objects.filter(
+        reviews__pub_date__gte=since, category__isnull=False
+    ).order_by().values_list('pk', 'category_id').distinct():
+        members[(CATEGORY, category_id)].append(title_id)
+    for title_id, genre_id in Title.genre.through.objects.filter(
+        title__reviews__pub_date__gte=since
+    ).values_list('title_id', 'genre_id').distinct():
+        members[(GENRE, genre_id)].append(title_id)
+    rankings = []
+    for (scope, scope_id), title_ids in members.items():
+        best = sorted(
+            (title_id for title_id in title_ids if title_id in scores),
+            key=lambda title_id: (-scores[title_id][0], title_id)
+        )[:leaderboards()['SIZE']]
+        rankings.extend(
+            TitleRanking(
+                board=TRENDING, scope=scope, scope_id=scope_id,
+                position=position, title_id=title_id,
+                score=scores[title_id][0], review_count=scores[title_id][1],
+            )
+            for position, title_id in enumerate(best, 1)
+        )
+    with transaction.atomic():
+        TitleRanking.objects.filter(board=TRENDING).delete()
+        TitleRanking.objects.bulk_create(rankings)
+    return len(members)
+
+
+def refresh_leaderboards(full=False):
+    """
+    Обновляет материализованные рейтинги. Рейтинг лучших пересчитывается
+    только в областях, где после прошлого обновления менялись отзывы
+    или произведения; при первом запуске и с full=True — целиком.
+    Возвращает число пересчитанных областей по каждому рейтингу.
+    """
+    started = timezone.now()
+    refreshed = CollectionVersion.objects.filter(key=REFRESHED_KEY).first()
+    since = None if full or refreshed is None else refreshed.modified
+    top = refresh_top(since)
+    trending = refresh_trending(started)
+    CollectionVersion.objects.bump([REFRESHED_KEY])
+    CollectionVersion.objects.filter(key=REFRESHED_KEY).update(
+        modified=started
+    )
+    return {TOP: top, TRENDING: trending}
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import FAILED, PENDING, SENDING, SENT, OutgoingEmail
+
+
+def queue_email(subject, message, recipient, from_email=None):
+    """
+    Ставит письмо в очередь; отправляет его команда send_emails.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject, body=message, recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX['RETRY_DELAY'] * 2 ** (attempts - 1)
+    )
+
+
+def claim_batch(batch_size, now):
+    """
+    В короткой транзакции помечает порцию писем, срок которых подошёл,
+    как отправляемые. Письма, которые воркер не успел отправить за
+    CLAIM_TIMEOUT секунд (например, он завершился), забираются заново.
+    """
+    lease = timedelta(seconds=settings.EMAIL_OUTBOX['CLAIM_TIMEOUT'])
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=(PENDING, SENDING), next_attempt_at__lte=now
+            )[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(status=SENDING, next_attempt_at=now + lease)
+    return emails
+
+
+def release(emails, now):
+    OutgoingEmail.objects.filter(
+        pk__in=[email.pk for email in emails], status=SENDING
+    ).update(status=PENDING, next_attempt_at=now)
+
+
+def record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.next_attempt_at = now + retry_delay(email.attempts)
+    email.status = PENDING
+    if email.attempts >= settings.EMAIL_OUTBOX['MAX_ATTEMPTS']:
+        email.status = FAILED
+        email.body = ''
+    email.save(update_fields=(
+        'attempts', 'last_error', 'next_attempt_at', 'status', 'body'
+    ))
+
+
+def deliver_pending(batch_size=None):
+    """
+    Отправляет порцию писем, срок которых подошёл, через одно
+    соединение с почтовым сервером; строки во время отправки не
+    заблокированы. Текст отправленного письма с кодом подтверждения
+    стирается. Неудачные письма откладываются с экспоненциально
+    растущей задержкой, после MAX_ATTEMPTS попыток помечаются как
+    неотправленные. Возвращает число отправленных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX['BATCH_SIZE']
+    now = timezone.now()
+    emails = claim_batch(batch_size, now)
+    if not emails:
+        return 0
+    sent = []
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject, body=email.body,
+                    from_email=email.from_email, to=[email.recipient],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    record_failure(email, error, now)
+                else:
+                    sent.append(email.pk)
+    finally:
+        OutgoingEmail.objects.filter(pk__in=sent).update(
+            status=SENT, sent_at=timezone.now(), last_error='', body='',
+            attempts=F('attempts') + 1,
+        )
+        release(emails, now)
+    return len(sent)
@@ -0,0 +1,96 @@
+import json
+
+from api.benchmark import (Benchmark, HttpTransport, TestClientTransport,
+                           generate_dataset)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from reviews.models import Review, Title, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест горячих путей API: список и фильтр произведений, '
+        'список и создание отзывов, регистрация и получение токена. '
+        'Печатает задержки p50/p95/p99, пропускную способность и число '
+        'SQL-запросов в формате JSON для сравнения между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--generate', action='store_true',
+            help='Сначала добавить в базу синтетические данные.'
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Количество запросов в каждом сценарии.'
+        )
+        parser.add_argument(
+            '--scenario', action='append', choices=Benchmark.scenarios,
+            help='Запустить только указанные сценарии.'
+        )
+        parser.add_argument(
+            '--base-url',
+            help=(
+                'Адрес запущенного сервера, например http://127.0.0.1:8000; '
+                'по умолчанию запросы идут через тестовый клиент Django.'
+            )
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Число параллельных клиентов, только вместе с --base-url.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Файл для результатов JSON.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > 1 and not options['base_url']:
+            raise CommandError(
+                'Параллельные запросы поддерживаются только с --base-url.'
+            )
+        if options['generate']:
+            generate_dataset(
+                options['titles'], options['reviews'], options['users'],
+                batch_size=options['batch_size'], seed=options['seed'],
+            )
+        transport = (
+            HttpTransport(options['base_url']) if options['base_url']
+            else TestClientTransport()
+        )
+        try:
+            benchmark = Benchmark(
+                transport, options['requests'], seed=options['seed'],
+                concurrency=options['concurrency'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        # Бенчмарк меряет стоимость запросов, а не срабатывание лимитов:
+        # все запросы идут от одного клиента. Для --base-url отключите
+        # ограничения на сервере через THROTTLE_ENABLED=False.
+        with override_settings(
+            ALLOWED_HOSTS=['*'],
+            THROTTLING={**settings.THROTTLING, 'ENABLED': False},
+        ):
+            scenarios = benchmark.run_all(options['scenario'])
+        report = json.dumps({
+            'target': transport.name,
+            'database': connection.vendor,
+            'seed': options['seed'],
+            'concurrency': options['concurrency'],
+            'dataset': {
+                'titles': Title.objects.count(),
+                'reviews': Review.objects.count(),
+                'users': User.objects.count(),
+            },
+            'scenarios': scenarios,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                stream.write(report)
+        else:
+            self.stdout.write(report)
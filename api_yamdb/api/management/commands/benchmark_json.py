@@ -0,0 +1,23 @@
+import json
+
+from api.benchmark import compare_json_backends
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость рендеринга и разбора JSON стандартными '
+        'классами DRF и FastJSONRenderer/FastJSONParser на ответе '
+        'со списком произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles', type=int, default=100,
+            help='Количество произведений в ответе.'
+        )
+        parser.add_argument('--rounds', type=int, default=200)
+
+    def handle(self, *args, **options):
+        report = compare_json_backends(options['titles'], options['rounds'])
+        self.stdout.write(json.dumps(report, indent=2))
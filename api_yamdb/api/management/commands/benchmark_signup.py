@@ -0,0 +1,83 @@
+import json
+import time
+
+from api.models import ConfirmationCode
+from django.conf import settings
+from django.contrib.auth.models import BaseUserManager
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from reviews.models import User
+
+
+def password_hash_code(user):
+    """
+    Прежняя выдача кода: случайный пароль, хэшированный PBKDF2.
+    """
+    user.set_password(BaseUserManager().make_random_password())
+    user.save()
+    return user.password
+
+
+def measure(count, action):
+    started = time.perf_counter()
+    for index in range(count):
+        action(index)
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': count,
+        'seconds': round(elapsed, 4),
+        'per_second': round(count / elapsed, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность выдачи кода подтверждения: '
+        'прежний способ (хэш пароля) и код в отдельной таблице, а также '
+        'эндпоинта регистрации целиком. Изменения в базе откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        self.client = Client()
+        with transaction.atomic():
+            users = [
+                User.objects.create_user(
+                    username=f'benchmark{index}',
+                    email=f'benchmark{index}@yamdb.fake',
+                )
+                for index in range(count)
+            ]
+            # Все запросы регистрации идут с одного адреса: без отключения
+            # лимитов прогон длиннее квоты auth_ip обрывается на 429.
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                THROTTLING={**settings.THROTTLING, 'ENABLED': False},
+            ):
+                results = {
+                    'password_hash_code': measure(
+                        count, lambda index: password_hash_code(users[index])
+                    ),
+                    'confirmation_code': measure(
+                        count,
+                        lambda index: ConfirmationCode.objects.issue(
+                            users[index]
+                        )
+                    ),
+                    'signup_endpoint': measure(count, self.signup),
+                }
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def signup(self, index):
+        response = self.client.post('/api/v1/auth/signup/', {
+            'username': f'signup{index}',
+            'email': f'signup{index}@yamdb.fake',
+        })
+        if response.status_code != 200:
+            raise CommandError(response.content.decode())
@@ -0,0 +1,139 @@
+import re
+
+from api.filters import TitleFilter
+from api.models import ALL, TOP, TitleRanking
+from api.pagination import KeysetPagination
+from api.views import TitleViewSet
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from reviews.models import (MODERATOR, Category, Comment, Genre, Review, Title,
+                            User)
+
+POSTGRESQL_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)')
+
+
+def sequential_scans(plan):
+    """
+    Возвращает таблицы, которые план читает целиком, без индекса.
+    """
+    if connection.vendor == 'postgresql':
+        return set(POSTGRESQL_SEQ_SCAN.findall(plan))
+    return {
+        table for table, rest in SQLITE_SCAN.findall(plan)
+        if 'USING' not in rest
+    }
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+        else:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+            )
+        row = cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для типовых запросов API и админки и завершается '
+        'с ошибкой, если какой-либо из них последовательно читает таблицу '
+        'больше порогового числа строк.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=int, default=10000,
+            help='Допустимый размер таблицы для последовательного чтения.'
+        )
+
+    def canonical_queries(self):
+        """
+        Запросы повторяют те, что выполняют вьюсеты, TitleFilter
+        и списки админки; значения параметров берутся из базы.
+        """
+        page = api_settings.PAGE_SIZE
+        titles = TitleViewSet.queryset.all()
+        title = Title.objects.order_by('pk').first()
+        review = Review.objects.order_by('pk').first()
+        year = title.year if title else 2000
+        genre = Genre.objects.values_list('slug', flat=True).first() or ''
+        category = (
+            Category.objects.values_list('slug', flat=True).first() or ''
+        )
+        reviews = Review.objects.filter(
+            title_id=title.pk if title else 0
+        ).select_related('author').order_by(*KeysetPagination.ordering)
+        comments = Comment.objects.filter(
+            review_id=review.pk if review else 0
+        ).select_related('author').order_by(*KeysetPagination.ordering)
+        pub_date = review.pub_date if review else timezone.now()
+        return {
+            'titles-list': titles[:page],
+            'titles-filter-year': TitleFilter(
+                {'year': year}, queryset=titles
+            ).qs[:page],
+            'titles-filter-genre': TitleFilter(
+                {'genre_exact': genre}, queryset=titles
+            ).qs[:page],
+            'titles-filter-category': TitleFilter(
+                {'category_exact': category}, queryset=titles
+            ).qs[:page],
+            'reviews-list': reviews[:page],
+            'reviews-cursor': reviews.filter(
+                pub_date__lte=pub_date
+            )[:page + 1],
+            'comments-list': comments[:page],
+            'comments-cursor': comments.filter(
+                pub_date__lte=pub_date
+            )[:page + 1],
+            'leaderboard-top': TitleRanking.objects.filter(
+                board=TOP, scope=ALL, scope_id=0
+            ).order_by('position').values_list(
+                'title_id', 'score', 'review_count'
+            )[:page],
+            'admin-users-role': User.objects.filter(role=MODERATOR)[:100],
+            'admin-reviews': Review.objects.select_related(
+                'title', 'author'
+            )[:100],
+            'admin-reviews-search': Review.objects.filter(
+                title_id=title.pk if title else 0
+            )[:100],
+            'admin-comments': Comment.objects.select_related(
+                'author', 'review__title', 'review__author'
+            )[:100],
+            'admin-users-search': User.objects.filter(
+                Q(username__istartswith='admin')
+                | Q(email__istartswith='admin')
+            )[:100],
+        }
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        sizes = {}
+        failures = []
+        for name, queryset in self.canonical_queries().items():
+            plan = queryset.explain()
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            for table in sorted(sequential_scans(plan)):
+                if table not in sizes:
+                    sizes[table] = table_rows(table)
+                if sizes[table] > threshold:
+                    failures.append(
+                        f'{name}: последовательное чтение {table} '
+                        f'({sizes[table]} строк)'
+                    )
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(
+            'Последовательных чтений больших таблиц не найдено.'
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from api.leaderboards import refresh_leaderboards
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет рейтинги лучших и популярных произведений; без --full '
+        'пересчитываются только затронутые изменениями категории и жанры.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать рейтинги всех категорий и жанров.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а обновлять рейтинги периодически.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.LEADERBOARDS['REFRESH_INTERVAL'],
+            help='Пауза в секундах между обновлениями.'
+        )
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            refreshed = refresh_leaderboards(full=full)
+            self.stdout.write(
+                'Пересчитано областей: ' + ', '.join(
+                    f'{board} {count}' for board, count in refreshed.items()
+                )
+            )
+            if not options['loop']:
+                return
+            full = False
+            time.sleep(options['interval'])
@@ -0,0 +1,39 @@
+import time
+
+from api.mail import deliver_pending
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX['BATCH_SIZE'],
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а опрашивать очередь постоянно.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.EMAIL_OUTBOX['POLL_INTERVAL'],
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent = deliver_pending(options['batch_size'])
+            except OSError as error:
+                self.stderr.write(f'Почтовый сервер недоступен: {error}')
+                sent = 0
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+            if not options['loop']:
+                return
+            if sent < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,241 @@
+import ipaddress
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .cache import response_cache
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    'api_request_duration_seconds': (
+        'Время обработки запроса', DURATION_BUCKETS
+    ),
+    'api_db_duration_seconds': (
+        'Время выполнения SQL-запросов за запрос', DURATION_BUCKETS
+    ),
+    'api_db_queries': ('Число SQL-запросов за запрос', QUERY_BUCKETS),
+    'api_db_connection_wait_seconds': (
+        'Ожидание соединения с базой: подключение и проверка', DURATION_BUCKETS
+    ),
+    'api_view_duration_seconds': (
+        'Время представления без SQL-запросов (в основном сериализаторы)',
+        DURATION_BUCKETS
+    ),
+    'api_render_duration_seconds': (
+        'Время рендеринга ответа', DURATION_BUCKETS
+    ),
+    'api_response_size_bytes': ('Размер тела ответа', SIZE_BUCKETS),
+}
+COUNTERS = {
+    'api_requests_total': 'Число запросов',
+    'api_db_connections_opened_total': 'Число новых соединений с базой',
+    'api_duplicate_queries_total': (
+        'Число повторяющихся SQL-запросов (признак N+1)'
+    ),
+}
+
+_local = threading.local()
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Метрики процесса: гистограммы и счётчики с метками endpoint, method.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {
+            name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for name, (_, buckets) in HISTOGRAMS.items()
+        }
+        self.counters = {name: defaultdict(int) for name in COUNTERS}
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            self.histograms[name][labels].observe(value)
+
+    def increment(self, name, labels, value=1):
+        with self._lock:
+            self.counters[name][labels] += value
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (description, buckets) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {description}',
+                          f'# TYPE {name} histogram']
+                for labels, histogram in sorted(self.histograms[name].items()):
+                    label_text = format_labels(labels)
+                    cumulative = 0
+                    for bound, count in zip(
+                        buckets + ('+Inf',), histogram.counts
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{label_text},le="{bound}"}} '
+                            f'{cumulative}'
+                        )
+                    lines.append(f'{name}_sum{{{label_text}}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{{label_text}}} {histogram.count}'
+                    )
+            for name, description in COUNTERS.items():
+                lines += [f'# HELP {name} {description}',
+                          f'# TYPE {name} counter']
+                for labels, value in sorted(self.counters[name].items()):
+                    lines.append(f'{name}{{{format_labels(labels)}}} {value}')
+        stats = response_cache.stats()
+        lines += [
+            '# HELP api_response_cache_requests_total '
+            'Обращения к кэшу ответов',
+            '# TYPE api_response_cache_requests_total counter',
+            f'api_response_cache_requests_total{{result="hit"}} '
+            f'{stats["hits"]}',
+            f'api_response_cache_requests_total{{result="miss"}} '
+            f'{stats["misses"]}',
+        ]
+        if resource is not None:
+            # ru_maxrss на Linux измеряется в килобайтах.
+            memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            lines += [
+                '# HELP process_max_resident_memory_bytes '
+                'Пиковый объём резидентной памяти процесса',
+                '# TYPE process_max_resident_memory_bytes gauge',
+                f'process_max_resident_memory_bytes{{pid="{os.getpid()}"}} '
+                f'{memory}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """
+    Замеры одного запроса; доступны коду запроса через current().
+    """
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_time = 0.0
+        self.render_time = 0.0
+        self.connection_wait = 0.0
+        self.connections_opened = 0
+        self.statements = defaultdict(int)
+        self._view_started = None
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def start_view(self):
+        self._view_started = (time.perf_counter(), self.db_time)
+
+    def finish_view(self):
+        """
+        Время представления без времени его SQL-запросов. Повторные
+        вызовы ничего не меняют.
+        """
+        if self._view_started is None:
+            return
+        started, db_time = self._view_started
+        self.view_time = (
+            time.perf_counter() - started - (self.db_time - db_time)
+        )
+        self._view_started = None
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def finish_render(self, response=None):
+        if self._render_started is not None:
+            self.render_time = time.perf_counter() - self._render_started
+            self._render_started = None
+
+    def duplicates(self, threshold):
+        return {
+            sql: count for sql, count in self.statements.items()
+            if count >= threshold
+        }
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def collect():
+    _local.metrics = RequestMetrics()
+    try:
+        yield _local.metrics
+    finally:
+        _local.metrics = None
+
+
+def is_allowed(request):
+    """
+    Метрики доступны с адресов из METRICS['ALLOWED_IPS'] или по токену
+    METRICS['TOKEN'] в заголовке Authorization: Bearer. Адрес берётся из
+    REMOTE_ADDR, а не из подделываемого X-Forwarded-For.
+    """
+    options = settings.METRICS
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        address = None
+    if address is not None and any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in options['ALLOWED_IPS']
+    ):
+        return True
+    token = options['TOKEN']
+    return bool(token) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    )
+
+
+def metrics(request):
+    if not is_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
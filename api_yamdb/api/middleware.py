@@ -0,0 +1,152 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from .compression import choose_encoding, compress, is_compressible
+from .metrics import collect, current, registry
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED = 'unmatched'
+
+
+def get_endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNMATCHED
+    return match.view_name
+
+
+class InstrumentationMiddleware:
+    """
+    Замеряет каждый запрос: общее время, число и время SQL-запросов,
+    ожидание соединения с базой, время представления без SQL (в API это
+    в основном сериализаторы), время рендеринга и размер ответа.
+    Результаты уходят в гистограммы для /metrics/ и в заголовок
+    Server-Timing. SQL-запрос, повторённый
+    не меньше DUPLICATE_QUERY_THRESHOLD раз, записывается в лог как
+    вероятный N+1.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = settings.INSTRUMENTATION['SERVER_TIMING']
+        self.duplicate_threshold = (
+            settings.INSTRUMENTATION['DUPLICATE_QUERY_THRESHOLD']
+        )
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with collect() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+            metrics.finish_view()
+        duration = time.perf_counter() - started
+        endpoint = get_endpoint(request)
+        labels = (('endpoint', endpoint), ('method', request.method))
+        registry.increment(
+            'api_requests_total',
+            labels + (('status', str(response.status_code)),)
+        )
+        registry.observe('api_request_duration_seconds', labels, duration)
+        registry.observe('api_db_duration_seconds', labels, metrics.db_time)
+        registry.observe('api_db_queries', labels, metrics.queries)
+        registry.observe(
+            'api_db_connection_wait_seconds', labels, metrics.connection_wait
+        )
+        if metrics.connections_opened:
+            registry.increment(
+                'api_db_connections_opened_total', labels,
+                metrics.connections_opened
+            )
+        registry.observe(
+            'api_view_duration_seconds', labels, metrics.view_time
+        )
+        registry.observe(
+            'api_render_duration_seconds', labels, metrics.render_time
+        )
+        if not response.streaming:
+            registry.observe(
+                'api_response_size_bytes', labels, len(response.content)
+            )
+        duplicates = metrics.duplicates(self.duplicate_threshold)
+        for sql, count in duplicates.items():
+            logger.warning(
+                'Повторяющийся SQL-запрос (%s раз) в %s: %s',
+                count, endpoint, sql
+            )
+        if duplicates:
+            registry.increment(
+                'api_duplicate_queries_total', labels, len(duplicates)
+            )
+        if self.server_timing:
+            timings = [
+                f'total;dur={duration * 1000:.1f}',
+                f'db;dur={metrics.db_time * 1000:.1f};'
+                f'desc="{metrics.queries} queries"',
+                f'dbconn;dur={metrics.connection_wait * 1000:.1f}',
+                f'view;dur={metrics.view_time * 1000:.1f}',
+                f'render;dur={metrics.render_time * 1000:.1f}',
+            ]
+            if duplicates:
+                timings.append(f'duplicates;desc="{len(duplicates)}"')
+            response['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current()
+        if metrics is not None:
+            metrics.start_view()
+
+    def process_template_response(self, request, response):
+        """
+        Ответы DRF рендерятся после всех process_template_response; этот
+        вызывается последним, сразу перед рендерингом.
+        """
+        metrics = current()
+        if metrics is not None:
+            metrics.finish_view()
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы brotli или gzip по заголовку Accept-Encoding клиента.
+    Не трогает потоковые и уже сжатые ответы, ответы короче
+    COMPRESSION['MIN_SIZE'] и нетекстовые типы. Сильный ETag становится
+    слабым: сжатое тело побайтово отличается от исходного.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION['MIN_SIZE']
+        self.levels = {
+            'gzip': settings.COMPRESSION['GZIP_LEVEL'],
+            'br': settings.COMPRESSION['BROTLI_QUALITY'],
+        }
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or len(response.content) < self.min_size
+                or not is_compressible(response.get('Content-Type', ''))):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+        content = compress(response.content, encoding, self.levels[encoding])
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
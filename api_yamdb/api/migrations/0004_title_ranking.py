@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_stats'),
+        ('api', '0003_collectionversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collectionversion',
+            name='modified',
+            field=models.DateTimeField(db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('top', 'Лучшие'), ('trending', 'Популярные за неделю')], max_length=8, verbose_name='Рейтинг')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=8, verbose_name='Область')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='Категория или жанр')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Байесовская оценка')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+                'ordering': ('board', 'scope', 'scope_id', 'position'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['board', 'scope', 'scope_id', 'position', 'title', 'score', 'review_count'], name='title_ranking_covering_idx'),
+        ),
+    ]
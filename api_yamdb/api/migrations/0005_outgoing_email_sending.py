@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 07:05
+
+from django.db import migrations, models
+
+
+def purge_bodies(apps, schema_editor):
+    apps.get_model('api', 'OutgoingEmail').objects.filter(
+        status__in=('sent', 'failed')
+    ).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Ожидает отправки'), ('sending', 'Отправляется'), ('sent', 'Отправлено'), ('failed', 'Не отправлено')], default='pending', max_length=7, verbose_name='Статус'),
+        ),
+        migrations.RunPython(purge_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,220 @@
+import hashlib
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string
+
+PENDING = 'pending'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+CHOICE_OF_STATUS = [
+    (PENDING, 'Ожидает отправки'),
+    (SENDING, 'Отправляется'),
+    (SENT, 'Отправлено'),
+    (FAILED, 'Не отправлено'),
+]
+CONFIRMATION_CODE_CHARS = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+TOP = 'top'
+TRENDING = 'trending'
+CHOICE_OF_BOARD = [
+    (TOP, 'Лучшие'),
+    (TRENDING, 'Популярные за неделю'),
+]
+ALL = 'all'
+CATEGORY = 'category'
+GENRE = 'genre'
+CHOICE_OF_SCOPE = [
+    (ALL, 'Все произведения'),
+    (CATEGORY, 'Категория'),
+    (GENRE, 'Жанр'),
+]
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(verbose_name='Тема', max_length=255)
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(verbose_name='Отправитель', max_length=254)
+    recipient = models.EmailField(verbose_name='Получатель', max_length=254)
+    status = models.CharField(
+        verbose_name='Статус', choices=CHOICE_OF_STATUS, default=PENDING,
+        max_length=max([len(x[0]) for x in CHOICE_OF_STATUS])
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки', default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка', default=timezone.now
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки', blank=True, null=True
+    )
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoing_email_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{ self.recipient }: { self.subject }'
+
+
+def hash_code(code):
+    return hashlib.sha256(
+        f'{settings.SECRET_KEY}:{code.upper()}'.encode()
+    ).hexdigest()
+
+
+class ConfirmationCodeManager(models.Manager):
+    def issue(self, user):
+        """
+        Выдаёт пользователю новый код подтверждения, заменяя прежний.
+        В базе хранится только хэш кода.
+        """
+        code = get_random_string(
+            settings.CONFIRMATION_CODE['LENGTH'], CONFIRMATION_CODE_CHARS
+        )
+        self.update_or_create(user=user, defaults={
+            'code_hash': hash_code(code),
+            'expires_at': (
+                timezone.now() + settings.CONFIRMATION_CODE['LIFETIME']
+            ),
+        })
+        return code
+
+    def redeem(self, user, code):
+        """
+        Проверяет код за постоянное время и при совпадении гасит его.
+        Код принимается, только если его удалил именно этот вызов: из
+        параллельных запросов с одним кодом успешен один.
+        """
+        confirmation = self.filter(
+            user=user, expires_at__gt=timezone.now()
+        ).first()
+        if confirmation is None or not constant_time_compare(
+            confirmation.code_hash, hash_code(code)
+        ):
+            return False
+        deleted, _ = self.filter(
+            pk=confirmation.pk, code_hash=confirmation.code_hash
+        ).delete()
+        return deleted == 1
+
+
+class ConfirmationCode(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='confirmation_code', verbose_name='Пользователь'
+    )
+    code_hash = models.CharField(verbose_name='Хэш кода', max_length=64)
+    expires_at = models.DateTimeField(verbose_name='Действует до')
+
+    objects = ConfirmationCodeManager()
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{ self.user_id }: до { self.expires_at }'
+
+
+class CollectionVersionManager(models.Manager):
+    def bump(self, keys):
+        """
+        Увеличивает счётчики изменений коллекций и обновляет дату их
+        последнего изменения одним UPDATE; недостающие строки создаются
+        одним INSERT. Строку, созданную параллельно другим процессом,
+        повторно увеличивать не нужно: её счётчик уже изменился.
+        """
+        keys = set(keys)
+        now = timezone.now()
+        updated = self.filter(key__in=keys).update(
+            version=models.F('version') + 1, modified=now
+        )
+        if updated == len(keys):
+            return
+        existing = set(
+            self.filter(key__in=keys).values_list('key', flat=True)
+        )
+        self.bulk_create(
+            [
+                self.model(key=key, version=1, modified=now)
+                for key in sorted(keys - existing)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class CollectionVersion(models.Model):
+    key = models.CharField(
+        verbose_name='Коллекция', max_length=100, primary_key=True
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Счётчик изменений', default=0
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения', db_index=True
+    )
+
+    objects = CollectionVersionManager()
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+    def __str__(self):
+        return f'{ self.key }: { self.version }'
+
+
+class TitleRanking(models.Model):
+    board = models.CharField(
+        verbose_name='Рейтинг', choices=CHOICE_OF_BOARD,
+        max_length=max([len(x[0]) for x in CHOICE_OF_BOARD])
+    )
+    scope = models.CharField(
+        verbose_name='Область', choices=CHOICE_OF_SCOPE,
+        max_length=max([len(x[0]) for x in CHOICE_OF_SCOPE])
+    )
+    scope_id = models.PositiveIntegerField(
+        verbose_name='Категория или жанр', default=0
+    )
+    position = models.PositiveIntegerField(verbose_name='Место')
+    title = models.ForeignKey(
+        'reviews.Title', on_delete=models.CASCADE, related_name='rankings',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField(verbose_name='Байесовская оценка')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        ordering = ('board', 'scope', 'scope_id', 'position')
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        indexes = [
+            # Индекс содержит все читаемые столбцы: чтение рейтинга
+            # не обращается к таблице.
+            models.Index(
+                fields=[
+                    'board', 'scope', 'scope_id', 'position',
+                    'title', 'score', 'review_count',
+                ],
+                name='title_ranking_covering_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{ self.board } { self.scope }: { self.position }'
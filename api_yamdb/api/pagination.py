@@ -0,0 +1,94 @@
+import base64
+from collections import OrderedDict
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+INVALID_CURSOR = 'Неверный курсор.'
+MAX_PK = 2 ** 63 - 1
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничная разбивка по номеру страницы, а при наличии параметра
+    cursor в запросе — по ключу (pub_date, id) без COUNT(*) и OFFSET.
+    Первая страница в режиме курсора запрашивается с пустым `?cursor=`,
+    следующие — по ссылке next. Курсор движется только вперёд.
+    """
+    cursor_query_param = 'cursor'
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.cursor_mode = False
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_mode = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(pub_date__lte=pub_date).exclude(
+                pub_date=pub_date, pk__gte=pk
+            )
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(last.pub_date, last.pk)
+        )
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        return None
+
+    @staticmethod
+    def encode_cursor(pub_date, pk):
+        position = f'{pub_date.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+        try:
+            position = base64.urlsafe_b64decode(cursor.encode()).decode()
+            pub_date, pk = position.rsplit('|', 1)
+            pub_date, pk = parse_datetime(pub_date), int(pk)
+            # Курсор выдаётся с часовым поясом; дата вне диапазона при
+            # переводе в UTC вызывает OverflowError.
+            pub_date.astimezone(timezone.utc)
+        except (AttributeError, OverflowError, TypeError, ValueError):
+            raise NotFound(INVALID_CURSOR)
+        if timezone.is_naive(pub_date) or not 0 < pk <= MAX_PK:
+            raise NotFound(INVALID_CURSOR)
+        return pub_date, pk
@@ -28,7 +28,7 @@ class IsAuthorOrReadOnlyOrModeratorOrAdmin(BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         return (
-            obj.author == request.user
+            obj.author_id == request.user.pk
             or request.method in SAFE_METHODS
             or request.user.is_authenticated and request.user.is_admin()
             or request.user.is_authenticated and request.user.role == MODERATOR
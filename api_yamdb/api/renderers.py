@@ -0,0 +1,47 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерит JSON через orjson: datetime, UUID и dataclass он обрабатывает
+    сам, остальное (Decimal, timedelta, ленивые строки) передаётся
+    кодировщику DRF. Без orjson и при запросе отступов работает как
+    JSONRenderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        )):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data, default=encode_default, option=ORJSON_OPTIONS
+        )
+
+
+class FastJSONParser(JSONParser):
+    """
+    Разбирает тело запроса в UTF-8 через orjson, иначе — как JSONParser.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,170 @@
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = 'default'
+ROUND_ROBIN = 'round_robin'
+LEAST_LAG = 'least_lag'
+PIN_KEY = 'api:primary-pin:{pk}'
+POSTGRESQL_LAG = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+    'THEN 0 ELSE EXTRACT(EPOCH FROM now() - '
+    'pg_last_xact_replay_timestamp()) END'
+)
+
+_state = threading.local()
+
+
+def replication():
+    return settings.DATABASE_REPLICATION
+
+
+def pin_cache():
+    return caches[replication()['CACHE_ALIAS']]
+
+
+def pin_to_primary(user):
+    """
+    После записи пользователя его чтения STICKY_SECONDS секунд идут в
+    основную базу, чтобы он видел свои изменения несмотря на отставание
+    реплик.
+    """
+    seconds = replication()['STICKY_SECONDS']
+    if seconds > 0:
+        pin_cache().set(PIN_KEY.format(pk=user.pk), True, seconds)
+
+
+def is_pinned(user):
+    return (user.is_authenticated
+            and pin_cache().get(PIN_KEY.format(pk=user.pk)) is not None)
+
+
+def measure_lag(alias):
+    """
+    Отставание реплики в секундах; 0 для баз без репликации (SQLite).
+    None, если реплика недоступна.
+    """
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            connection.ensure_connection()
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRESQL_LAG)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    return float(lag) if lag is not None else None
+
+
+class ReplicaSelector:
+    """
+    Выбирает реплику для чтения: по кругу (round_robin) или с наименьшим
+    отставанием (least_lag). Отставание каждой реплики перепроверяется
+    не чаще раза в LAG_CHECK_INTERVAL секунд; реплики, отстающие больше
+    MAX_LAG_SECONDS или недоступные, пропускаются, а если подходящих
+    не осталось, чтение идёт в основную базу.
+    """
+    def __init__(self):
+        self._cycle = itertools.count()
+        self._lags = {}
+        self._lock = threading.Lock()
+
+    def get_lag(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            measured = self._lags.get(alias)
+        if measured is not None and measured[0] > now:
+            return measured[1]
+        lag = measure_lag(alias)
+        with self._lock:
+            self._lags[alias] = (
+                now + replication()['LAG_CHECK_INTERVAL'], lag
+            )
+        return lag
+
+    def choose(self):
+        options = replication()
+        replicas = list(options['REPLICAS'])
+        if not replicas:
+            return PRIMARY
+        if options['STRATEGY'] == ROUND_ROBIN:
+            offset = next(self._cycle)
+            replicas = replicas[offset % len(replicas):] + replicas[
+                :offset % len(replicas)
+            ]
+        lags = {}
+        for alias in replicas:
+            lag = self.get_lag(alias)
+            if lag is not None and lag <= options['MAX_LAG_SECONDS']:
+                if options['STRATEGY'] == ROUND_ROBIN:
+                    return alias
+                lags[alias] = lag
+        return min(lags, key=lags.get) if lags else PRIMARY
+
+    def reset(self):
+        with self._lock:
+            self._lags.clear()
+
+
+selector = ReplicaSelector()
+
+
+def get_read_alias():
+    return getattr(_state, 'alias', None)
+
+
+def set_read_alias(alias):
+    _state.alias = alias
+
+
+class ReplicaRouter:
+    """
+    Направляет чтения в реплику, выбранную для текущего запроса
+    ReplicaReadMixin; все записи и чтения вне таких запросов идут в
+    основную базу. Связанные объекты читаются из той же базы, что и
+    исходный объект.
+    """
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return get_read_alias()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    Запросы безопасными методами читают из реплики, если пользователь
+    недавно ничего не записывал. Успешная запись закрепляет чтения
+    пользователя за основной базой на STICKY_SECONDS секунд.
+    """
+    def initial(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            set_read_alias(selector.choose())
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(request.user)
+        return super().finalize_response(
+            request, response, *args, **kwargs
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            set_read_alias(None)
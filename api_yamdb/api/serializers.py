@@ -1,10 +1,9 @@
 import datetime
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.permissions import SAFE_METHODS
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats, User)
 
 
 class ConfirmationCodeSerializer(serializers.Serializer):
@@ -80,19 +79,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         validators=[MaxValueValidator(10), MinValueValidator(1)]
     )
 
-    def validate(self, data):
-        if (self.context['request'].method in SAFE_METHODS
-           or self.context['request'].method == 'PATCH'):
-            return data
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        reviews = self.context['request'].user.reviews
-        if reviews.filter(title=title).exists():
-            raise serializers.ValidationError(
-                'Вы уже оставляли отзыв на это произведение!'
-            )
-        return data
-
     class Meta:
         model = Review
         fields = ('id', 'title', 'text', 'author', 'score', 'pub_date')
@@ -111,15 +97,70 @@ class TitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
 
 class ReadTitleSerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
-        read_only_fields = ['__all__']
+        fields = ('id', 'name', 'year', 'rating', 'description',
+                  'genre', 'category')
+        read_only_fields = fields
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    position = serializers.IntegerField()
+    score = serializers.FloatField()
+    review_count = serializers.IntegerField()
+    title = ReadTitleSerializer()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['score'] = round(data['score'], 2)
+        return data
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField()
+    mean = serializers.FloatField()
+    median = serializers.FloatField()
+    recent_average = serializers.FloatField()
+    recent_count = serializers.FloatField()
+    histogram = serializers.DictField(child=serializers.IntegerField())
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'count', 'mean', 'median', 'recent_average',
+                  'recent_count', 'histogram')
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in ('mean', 'recent_average', 'recent_count'):
+            if data[name] is not None:
+                data[name] = round(data[name], 2)
+        return data
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    title = serializers.IntegerField(min_value=1)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        validators=[MaxValueValidator(10), MinValueValidator(1)]
+    )
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    year = serializers.IntegerField(
+        validators=[MaxValueValidator(datetime.datetime.now().year)]
+    )
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
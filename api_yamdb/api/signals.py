@@ -0,0 +1,126 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_saved
+
+from .authentication import invalidate_user
+from .cache import response_cache
+from .models import CollectionVersion
+
+CACHED_MODELS = (Category, Genre, Review, Title)
+
+CHANGED_COLLECTIONS = {
+    Category: lambda category: ('categories', 'titles'),
+    Genre: lambda genre: ('genres', 'titles'),
+    Title: lambda title: ('titles', f'title:{title.pk}:reviews'),
+    Review: lambda review: (
+        'titles', f'title:{review.title_id}:reviews',
+        f'review:{review.pk}:comments',
+    ),
+    Comment: lambda comment: (f'review:{comment.review_id}:comments',),
+    User: lambda user: ('users',),
+}
+
+PENDING_ATTR = 'api_pending_changes'
+
+
+class PendingChanges:
+    """
+    Поколения кэша и ключи коллекций, изменённые в текущей транзакции.
+    Всё сдвигается один раз после фиксации: каскадное удаление сотен
+    комментариев не выполняет UPDATE на каждый, а параллельный запрос
+    не закэширует ответ с ещё не зафиксированными данными под новым
+    поколением.
+    """
+    def __init__(self):
+        self.generations = set()
+        self.keys = set()
+
+    def flush(self):
+        for name in sorted(self.generations):
+            response_cache.bump_generation(name)
+        if self.keys:
+            CollectionVersion.objects.bump(self.keys)
+
+
+def defer_bump(keys=(), models=(), using=DEFAULT_DB_ALIAS):
+    connection = transaction.get_connection(using)
+    pending = PendingChanges()
+    if connection.in_atomic_block:
+        current = getattr(connection, PENDING_ATTR, None)
+        # После отката транзакции или точки сохранения её обработчик
+        # on_commit снят, и изменения собираются заново.
+        if current is not None and any(
+            callback == current.flush
+            for _, callback in connection.run_on_commit
+        ):
+            pending = current
+        else:
+            setattr(connection, PENDING_ATTR, pending)
+            transaction.on_commit(pending.flush, using=using)
+    pending.generations.update(
+        model._meta.label_lower for model in models
+        if model in CACHED_MODELS
+    )
+    pending.keys.update(keys)
+    if not connection.in_atomic_block:
+        pending.flush()
+
+
+def bump_cache_generation(sender, using, **kwargs):
+    """
+    Сдвигает поколение модели, делая устаревшими закэшированные ответы.
+    """
+    defer_bump(models=(sender,), using=using)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_cache_generation, sender=model)
+    post_delete.connect(bump_cache_generation, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_generation(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """
+    Смена жанров отмечает и изменённые произведения, чтобы
+    refresh_leaderboards пересчитал рейтинги их жанров.
+    """
+    if action.startswith('post_'):
+        title_ids = (pk_set or ()) if reverse else (instance.pk,)
+        defer_bump(['titles'] + [
+            f'title:{pk}:reviews' for pk in title_ids
+        ], (Title,), kwargs['using'])
+
+
+def bump_collection_version(sender, instance, using, **kwargs):
+    """
+    Сдвигает счётчики изменений коллекций, из которых строятся ETag.
+    Подключается только к моделям из CHANGED_COLLECTIONS: обработчик
+    post_delete без sender отключил бы быстрое удаление у всех моделей.
+    """
+    defer_bump(CHANGED_COLLECTIONS[sender](instance), using=using)
+
+
+for model in CHANGED_COLLECTIONS:
+    post_save.connect(bump_collection_version, sender=model)
+    post_delete.connect(bump_collection_version, sender=model)
+
+
+@receiver(bulk_saved)
+def bump_after_bulk_save(sender, instances, **kwargs):
+    collections = CHANGED_COLLECTIONS.get(sender, lambda instance: ())
+    defer_bump([
+        key for instance in instances for key in collections(instance)
+    ], (sender,))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш пользователя и claims его токенов после изменения
+    роли или других данных через UserViewSet, self_user или админку.
+    """
+    invalidate_user(instance.pk)
@@ -0,0 +1,102 @@
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+UNKNOWN_FIELDS = 'Неизвестные поля: {names}.'
+
+
+def parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Параметр ?fields=a,b оставляет в ответе только перечисленные поля,
+    ?expand=c вкладывает связанные объекты из expandable; без expand они
+    выводятся своими slug. Без обоих параметров ответ не меняется.
+    Запрос к базе сокращается вместе с ответом: ненужные колонки
+    откладываются через only(), ненужные select_related и
+    prefetch_related отбрасываются.
+
+    sparse_columns сопоставляет полю сериализатора колонки для only(),
+    по умолчанию колонка совпадает с именем поля. Колонки always_load
+    загружаются всегда, например для сортировки и пагинации.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_columns = {}
+    expandable = {}
+    always_load = ('id',)
+
+    @cached_property
+    def sparse_fields(self):
+        """
+        Возвращает пару (поля, вложенные поля) или None, если ответ
+        не нужно сокращать.
+        """
+        params = self.request.query_params
+        if (self.request.method not in SAFE_METHODS
+                or (self.fields_query_param not in params
+                    and self.expand_query_param not in params)):
+            return None
+        available = set(self.get_serializer_class()().fields)
+        fields = parse_names(params.get(self.fields_query_param, ''))
+        expand = parse_names(params.get(self.expand_query_param, ''))
+        errors = {}
+        if fields - available:
+            errors[self.fields_query_param] = [UNKNOWN_FIELDS.format(
+                names=', '.join(sorted(fields - available))
+            )]
+        if expand - set(self.expandable):
+            errors[self.expand_query_param] = [UNKNOWN_FIELDS.format(
+                names=', '.join(sorted(expand - set(self.expandable)))
+            )]
+        if errors:
+            raise ValidationError(errors)
+        return fields or available, expand
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fields is None:
+            return serializer
+        fields, expand = self.sparse_fields
+        child = getattr(serializer, 'child', serializer)
+        for name in list(child.fields):
+            if name not in fields:
+                child.fields.pop(name)
+            elif name in self.expandable and name not in expand:
+                child.fields[name] = serializers.SlugRelatedField(
+                    slug_field=self.expandable[name], read_only=True,
+                    many=isinstance(
+                        child.fields[name], serializers.ListSerializer
+                    ),
+                )
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_fields is None:
+            return queryset
+        fields, _ = self.sparse_fields
+        columns = set(self.always_load)
+        for name in fields:
+            columns.update(self.sparse_columns.get(name, (name,)))
+        related = {
+            column.split(LOOKUP_SEP)[0] for column in columns
+            if LOOKUP_SEP in column
+        }
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            kept = [name for name in select_related if name in related]
+            queryset = queryset.select_related(None)
+            if kept:
+                queryset = queryset.select_related(*kept)
+        prefetch = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup) in fields
+        ]
+        return queryset.prefetch_related(None).prefetch_related(
+            *prefetch
+        ).only(*columns)
@@ -0,0 +1,182 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class BaseBucketStore:
+    """
+    Хранилище корзин токенов. Корзина хранится одним числом — моментом,
+    когда она снова станет полной (GCRA): каждый запрос сдвигает его на
+    interval, а запрос, после которого до этого момента осталось больше
+    capacity интервалов, отклоняется.
+    """
+    def consume(self, key, interval, capacity):
+        """
+        Забирает токен из корзины key. Возвращает 0, если токен был,
+        иначе — сколько секунд ждать следующего.
+        """
+        raise NotImplementedError
+
+
+class LocalBucketStore(BaseBucketStore):
+    """
+    Корзины в памяти процесса: проверка занимает микросекунды, но при
+    нескольких воркерах лимит действует в каждом отдельно. Хранится не
+    больше max_keys корзин, давно не использованные вытесняются первыми:
+    они, скорее всего, уже полны.
+    """
+    def __init__(self, max_keys=100000, **options):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, interval, capacity):
+        now = time.monotonic()
+        with self._lock:
+            full_at = max(self._buckets.get(key, now), now) + interval
+            if full_at - now > capacity * interval:
+                return full_at - now - capacity * interval
+            self._buckets[key] = full_at
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore(BaseBucketStore):
+    """
+    Общие для всех процессов корзины в кэше Django из CACHES. Токен
+    забирается атомарным incr момента заполнения в миллисекундах;
+    отклонённый запрос возвращает его decr. Для опустевшей корзины
+    момент сбрасывается на текущее время; при гонке в этот момент
+    лишними могут пройти лишь одновременные первые запросы к полной
+    корзине.
+    """
+    prefix = 'api:throttle:'
+
+    def __init__(self, alias='default', **options):
+        self.cache = caches[alias]
+
+    def consume(self, key, interval, capacity):
+        key = self.prefix + key
+        now = int(time.time() * 1000)
+        step = max(int(interval * 1000), 1)
+        timeout = math.ceil(step * capacity / 1000)
+        if self.cache.add(key, now + step, timeout):
+            return 0.0
+        try:
+            full_at = self.cache.incr(key, step)
+        except ValueError:
+            self.cache.set(key, now + step, timeout)
+            return 0.0
+        if full_at - step < now:
+            self.cache.set(key, now + step, timeout)
+            return 0.0
+        if full_at - now > step * capacity:
+            try:
+                self.cache.decr(key, step)
+            except ValueError:
+                pass
+            return (full_at - now - step * capacity) / 1000
+        self.cache.touch(key, timeout)
+        return 0.0
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _load_store():
+    options = {
+        key.lower(): value for key, value in settings.THROTTLING.items()
+        if key != 'ENABLED'
+    }
+    return import_string(options.pop('store'))(**options)
+
+
+bucket_store = SimpleLazyObject(_load_store)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты по корзине токенов из bucket_store: ставка
+    'N/период' из DEFAULT_THROTTLE_RATES даёт корзину на N токенов,
+    которая пополняется на N за период. Запросов к базе не выполняет.
+    """
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLING['ENABLED']:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.delay = bucket_store.consume(
+            self.key, self.duration / self.num_requests, self.num_requests
+        )
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class AuthRateThrottle(TokenBucketThrottle):
+    """
+    Запросы к регистрации и получению токена с одного IP-адреса.
+    """
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class AuthUsernameRateThrottle(TokenBucketThrottle):
+    """
+    Запросы к регистрации и получению токена для одного username, с
+    каких бы адресов они ни приходили: защищает от подбора кода
+    подтверждения.
+    """
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        username = (
+            request.data.get('username')
+            if isinstance(request.data, dict) else None
+        )
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': username.lower()
+        }
+
+
+class UserWriteRateThrottle(TokenBucketThrottle):
+    """
+    Записи одного пользователя; чтения не ограничиваются.
+    """
+    def get_cache_key(self, request, view):
+        if (request.method in SAFE_METHODS
+                or not request.user.is_authenticated):
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': request.user.pk
+        }
+
+
+class ReviewWriteRateThrottle(UserWriteRateThrottle):
+    scope = 'review_write'
+
+
+class CommentWriteRateThrottle(UserWriteRateThrottle):
+    scope = 'comment_write'
@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, create_token,
-                    create_user, self_user)
+                    LeaderboardViewSet, ReviewViewSet, TitleViewSet,
+                    UserViewSet, bulk_reviews, create_token, create_user,
+                    self_user)
 
 app_name = 'api'
 
@@ -12,6 +13,10 @@ router_v1.register(r'users', UserViewSet, basename='users')
 router_v1.register(r'genres', GenreViewSet, basename='genres')
 router_v1.register(r'categories', CategoryViewSet, basename='categories')
 router_v1.register(r'titles', TitleViewSet, basename='titles')
+router_v1.register(
+    r'leaderboards/(?P<board>top|trending)', LeaderboardViewSet,
+    basename='leaderboards'
+)
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet, basename='reviews'
 )
@@ -22,6 +27,7 @@ router_v1.register(
 
 urlpatterns = [
     path('v1/users/me/', self_user, name='me'),
+    path('v1/reviews/bulk/', bulk_reviews, name='reviews-bulk'),
     path('v1/', include(router_v1.urls)),
     path(
         'v1/auth/signup/', create_user,
@@ -1,27 +1,40 @@
 from django.conf import settings
-from django.contrib.auth.models import BaseUserManager
-from django.core.mail import BadHeaderError, send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters import rest_framework as fl
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import (SAFE_METHODS, AllowAny,
                                         IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import Category, Genre, Review, Title, TitleStats, User
 
+from .authentication import add_user_claims, get_user_instance
+from .batch import REVIEW_ALREADY_EXISTS, create_reviews, create_titles
+from .cache import CachedListMixin, CachedRetrieveMixin
+from .conditional import ConditionalRequestMixin
 from .filters import TitleFilter
+from .mail import queue_email
+from .models import ALL, CATEGORY, GENRE, ConfirmationCode, TitleRanking
+from .pagination import KeysetPagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorOrReadOnlyOrModeratorOrAdmin)
+from .replicas import ReplicaReadMixin, pin_to_primary
 from .serializers import (CategorySerializer, CommentSerializer,
                           ConfirmationCodeSerializer, GenreSerializer,
-                          ReadTitleSerializer, ReviewSerializer,
-                          TitleSerializer, UsernameEmailSerializer,
+                          LeaderboardEntrySerializer, ReadTitleSerializer,
+                          ReviewSerializer, TitleSerializer,
+                          TitleStatsSerializer, UsernameEmailSerializer,
                           UserSerializer)
+from .sparse import SparseFieldsMixin
+from .throttling import (AuthRateThrottle, AuthUsernameRateThrottle,
+                         CommentWriteRateThrottle, ReviewWriteRateThrottle)
 
 ACTIVATE = 'Активируйте свой аккаунт.'
 CONFIRMATION_CODE = (
@@ -31,10 +44,12 @@ CONFIRMATION_CODE = (
 )
 USERNAME_ALREADY_EXISTS = 'Пользователь с таким username уже существует!'
 EMAIL_ALREADY_EXISTS = 'Пользователь с таким email уже существует!'
+INVALID_LIMIT = 'Укажите целое число.'
 
 
 @api_view(['POST'])
 @permission_classes((AllowAny,))
+@throttle_classes((AuthRateThrottle, AuthUsernameRateThrottle))
 def create_user(request):
     serializer = UsernameEmailSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -48,75 +63,177 @@ def create_user(request):
         if User.objects.filter(email=email).exists():
             raise ValidationError(EMAIL_ALREADY_EXISTS)
         user = User.objects.create_user(username=username, email=email)
-    user.set_password(BaseUserManager().make_random_password())
-    user.save()
-    confirmation_code = user.password
-    try:
-        send_mail(
-            subject=ACTIVATE, recipient_list=[email],
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            message=CONFIRMATION_CODE.format(
-                confirmation_code=confirmation_code,
-            ),
-            fail_silently=False
-        )
-    except BadHeaderError as error:
-        raise BadHeaderError(f'Email не был отправлен: { error }')
+    confirmation_code = ConfirmationCode.objects.issue(user)
+    queue_email(
+        subject=ACTIVATE, recipient=email,
+        message=CONFIRMATION_CODE.format(
+            confirmation_code=confirmation_code,
+        ),
+    )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes((AllowAny,))
+@throttle_classes((AuthRateThrottle, AuthUsernameRateThrottle))
 def create_token(request):
     serializer = ConfirmationCodeSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data.get('username')
-    if not User.objects.filter(username=username).exists():
-        return Response(status=status.HTTP_404_NOT_FOUND)
-    user = User.objects.get(username=username)
+    user = get_object_or_404(User, username=username)
     confirmation_code = serializer.validated_data.get('confirmation_code')
-    if user.password == confirmation_code:
-        token = str(RefreshToken.for_user(user).access_token)
+    if ConfirmationCode.objects.redeem(user, confirmation_code):
+        refresh = add_user_claims(RefreshToken.for_user(user), user)
+        token = str(refresh.access_token)
         return Response(data={"token": token}, status=status.HTTP_200_OK)
     return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes((IsAuthenticated,))
+@throttle_classes((ReviewWriteRateThrottle,))
+def bulk_reviews(request):
+    author = get_user_instance(request.user)
+    pin_to_primary(request.user)
+    return create_reviews(author, request.data).response()
+
+
 @api_view(['GET', 'PATCH'])
 @permission_classes((IsAuthenticated,))
 def self_user(request):
+    user = get_user_instance(request.user)
     if request.method == 'GET':
-        user = get_object_or_404(User, username=request.user.username)
         serializer = UserSerializer(user)
         return Response(serializer.data)
-    serializer = UserSerializer(request.user, data=request.data, partial=True)
+    # Копия из кэша могла устареть: изменения сохраняются поверх
+    # актуальной строки.
+    user = User.objects.get(pk=request.user.pk)
+    serializer = UserSerializer(user, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
-    serializer.save(role=request.user.role)
+    serializer.save(role=user.role)
+    pin_to_primary(user)
     return Response(serializer.data)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all()
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     lookup_field = 'username'
+    etag_collections = ('users',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                   CachedRetrieveMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+    sparse_columns = {
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    expandable = {'genre': 'slug', 'category': 'slug'}
+    cache_models = (Title, Genre, Category, Review)
+    etag_collections = ('titles',)
+    lookup_value_regex = r'\d+'
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (fl.DjangoFilterBackend,)
+    filter_backends = (fl.DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'name')
 
     def get_serializer_class(self):
         if self.request.method not in SAFE_METHODS:
             return TitleSerializer
         return ReadTitleSerializer
 
+    @action(detail=False)
+    def search(self, request):
+        return self.cached_response(self.search_results, request)
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """
+        Распределение оценок произведения из TitleStats: один запрос по
+        первичному ключу, таблица отзывов не читается.
+        """
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            stats = TitleStats(
+                title=get_object_or_404(Title.objects.only('pk'), pk=pk)
+            )
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(detail=False, methods=['post'], permission_classes=(IsAdmin,))
+    def bulk(self, request):
+        return create_titles(request.data).response()
+
+    def search_results(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).search(
+            request.query_params.get('q', '')
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class LeaderboardViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                         viewsets.GenericViewSet):
+    """
+    Рейтинги лучших (top) и популярных (trending) произведений, общие или
+    по категории и жанру. Места читаются из TitleRanking только по
+    покрывающему индексу, произведения — по первичным ключам.
+    """
+    etag_collections = ('leaderboards',)
+    pagination_class = None
+
+    def get_scope(self, request):
+        for scope, model in ((CATEGORY, Category), (GENRE, Genre)):
+            slug = request.query_params.get(scope)
+            if slug:
+                return scope, get_object_or_404(
+                    model.objects.only('pk'), slug=slug
+                ).pk
+        return ALL, 0
+
+    def get_limit(self, request):
+        size = settings.LEADERBOARDS['SIZE']
+        try:
+            limit = int(request.query_params.get('limit', size))
+        except ValueError:
+            raise ValidationError({'limit': INVALID_LIMIT})
+        return min(max(limit, 1), size)
+
+    def list(self, request, board=None):
+        scope, scope_id = self.get_scope(request)
+        rankings = list(TitleRanking.objects.filter(
+            board=board, scope=scope, scope_id=scope_id
+        ).order_by('position').values_list(
+            'title_id', 'score', 'review_count'
+        )[:self.get_limit(request)])
+        titles = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre').in_bulk(
+            [title_id for title_id, _, _ in rankings]
+        )
+        entries = [
+            {'position': position, 'score': score,
+             'review_count': review_count, 'title': titles[title_id]}
+            for position, (title_id, score, review_count)
+            in enumerate((row for row in rankings if row[0] in titles), 1)
+        ]
+        return Response({
+            'board': board,
+            'results': LeaderboardEntrySerializer(entries, many=True).data,
+        })
 
-class MixinViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
-                   mixins.DestroyModelMixin,
+
+class MixinViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                   CachedListMixin, mixins.CreateModelMixin,
+                   mixins.ListModelMixin, mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
@@ -126,39 +243,78 @@ class MixinViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
 
 class GenreViewSet(MixinViewSet):
     queryset = Genre.objects.all()
+    cache_models = (Genre,)
+    etag_collections = ('genres',)
     serializer_class = GenreSerializer
 
 
 class CategoryViewSet(MixinViewSet):
     queryset = Category.objects.all()
+    cache_models = (Category,)
+    etag_collections = ('categories',)
     serializer_class = CategorySerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                     SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    pagination_class = KeysetPagination
+    sparse_columns = {'author': ('author', 'author__username')}
+    always_load = ('id', 'pub_date', 'review')
+    etag_collections = ('review:{review_id}:comments',)
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAuthorOrReadOnlyOrModeratorOrAdmin
     )
+    throttle_classes = (CommentWriteRateThrottle,)
+
+    @cached_property
+    def review(self):
+        return get_object_or_404(
+            Review,
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.review.comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author=get_user_instance(self.request.user), review=self.review
+        )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, ConditionalRequestMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    pagination_class = KeysetPagination
+    sparse_columns = {'author': ('author', 'author__username')}
+    always_load = ('id', 'pub_date', 'title')
+    etag_collections = ('title:{title_id}:reviews',)
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAuthorOrReadOnlyOrModeratorOrAdmin
     )
+    throttle_classes = (ReviewWriteRateThrottle,)
+
+    @cached_property
+    def title(self):
+        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        author = get_user_instance(self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(author=author, title=self.title)
+        except IntegrityError:
+            # Ошибкой повтора считается только отзыв, который уже есть;
+            # остальные нарушения ограничений пробрасываются дальше.
+            if not Review.objects.filter(
+                author=author, title=self.title
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_ALREADY_EXISTS]}
+            )
@@ -0,0 +1,8 @@
+import os
+
+from api.asgi import AsyncGateway
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+application = AsyncGateway(get_wsgi_application())
@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 env_path = Path('infra/') / '.env'
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.InstrumentationMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,10 +70,32 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', default='True') == 'True',
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', default='False') == 'True',
     }
 }
 
+DB_REPLICA_HOSTS = [
+    host for host in os.getenv('DB_REPLICA_HOSTS', default='').split(',') if host
+]
+for index, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    DATABASES[f'replica_{index}'] = dict(
+        DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'}
+    )
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+DATABASE_REPLICATION = {
+    'REPLICAS': [f'replica_{index}' for index in range(1, len(DB_REPLICA_HOSTS) + 1)],
+    'STRATEGY': os.getenv('DB_REPLICA_STRATEGY', default='round_robin'),
+    'STICKY_SECONDS': int(os.getenv('DB_REPLICA_STICKY_SECONDS', default=10)),
+    'MAX_LAG_SECONDS': float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', default=30)),
+    'LAG_CHECK_INTERVAL': float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', default=5)),
+    'CACHE_ALIAS': 'default',
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -96,6 +121,7 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATICFILES_STORAGE = 'api.compression.CompressedStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -107,10 +133,104 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.TokenClaimsAuthentication'
+        if os.getenv('JWT_STATELESS_USER', default='False') == 'True'
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP_RATE', default='20/min'),
+        'auth_username': os.getenv('THROTTLE_AUTH_USERNAME_RATE', default='5/min'),
+        'review_write': os.getenv('THROTTLE_REVIEW_WRITE_RATE', default='30/min'),
+        'comment_write': os.getenv('THROTTLE_COMMENT_WRITE_RATE', default='60/min'),
+    },
+    # Число прокси перед приложением (nginx): IP клиента для ограничения
+    # частоты берётся из X-Forwarded-For.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+}
+
+# Корзины токенов для ограничения частоты запросов: в памяти процесса
+# (api.throttling.LocalBucketStore) или в общем кэше Django
+# (api.throttling.CacheBucketStore, ALIAS — имя кэша из CACHES).
+THROTTLING = {
+    'ENABLED': os.getenv('THROTTLE_ENABLED', default='True') == 'True',
+    'STORE': os.getenv('THROTTLE_STORE', default='api.throttling.LocalBucketStore'),
+    'MAX_KEYS': int(os.getenv('THROTTLE_MAX_KEYS', default=100000)),
+    'ALIAS': 'default',
+}
+
+API_RESPONSE_CACHE = {
+    'BACKEND': os.getenv('API_CACHE_BACKEND', default='api.cache.LRUCacheBackend'),
+    'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', default=60)),
+    'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', default=1024)),
+}
+
+BULK_WRITE = {
+    'MAX_ITEMS': int(os.getenv('BULK_WRITE_MAX_ITEMS', default=500)),
+}
+
+COMPRESSION = {
+    'MIN_SIZE': int(os.getenv('COMPRESSION_MIN_SIZE', default=1024)),
+    'GZIP_LEVEL': int(os.getenv('COMPRESSION_GZIP_LEVEL', default=6)),
+    'BROTLI_QUALITY': int(os.getenv('COMPRESSION_BROTLI_QUALITY', default=5)),
+}
+
+ASGI = {
+    'READ_THREADS': int(os.getenv('ASGI_READ_THREADS', default=16)),
+    'WRITE_THREADS': int(os.getenv('ASGI_WRITE_THREADS', default=4)),
+}
+
+INSTRUMENTATION = {
+    'SERVER_TIMING': os.getenv('SERVER_TIMING', default='True') == 'True',
+    'DUPLICATE_QUERY_THRESHOLD': int(os.getenv('DUPLICATE_QUERY_THRESHOLD', default=3)),
+}
+
+# /metrics/ отдаётся адресам и подсетям из METRICS_ALLOWED_IPS (через
+# пробел) или по заголовку Authorization: Bearer <METRICS_TOKEN>.
+METRICS = {
+    'ALLOWED_IPS': os.getenv('METRICS_ALLOWED_IPS', default='127.0.0.1 ::1').split(),
+    'TOKEN': os.getenv('METRICS_TOKEN', default=''),
+}
+
+# После изменения периода полураспада выполните recount_ratings --all.
+REVIEW_STATS = {
+    'RECENT_HALF_LIFE_DAYS': float(os.getenv('REVIEW_STATS_HALF_LIFE_DAYS', default=30)),
+}
+if REVIEW_STATS['RECENT_HALF_LIFE_DAYS'] < 1:
+    raise ImproperlyConfigured(
+        'REVIEW_STATS_HALF_LIFE_DAYS должен быть не меньше 1 дня.'
+    )
+
+LEADERBOARDS = {
+    'SIZE': int(os.getenv('LEADERBOARD_SIZE', default=100)),
+    'PRIOR_WEIGHT': float(os.getenv('LEADERBOARD_PRIOR_WEIGHT', default=10)),
+    'TRENDING_DAYS': int(os.getenv('LEADERBOARD_TRENDING_DAYS', default=7)),
+    'REFRESH_INTERVAL': float(os.getenv('LEADERBOARD_REFRESH_INTERVAL', default=300)),
+}
+
+# Кэш по умолчанию хранит метки изменения пользователей, закрепления
+# чтений за основной базой и корзины ограничения частоты, поэтому при
+# нескольких воркерах он должен быть общим (в docker-compose — memcached).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    },
+}
+
+API_USER_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('API_USER_CACHE_TIMEOUT', default=60)),
 }
 
 SIMPLE_JWT = {
@@ -119,9 +239,22 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+CONFIRMATION_CODE = {
+    'LENGTH': 8,
+    'LIFETIME': timedelta(minutes=int(os.getenv('CONFIRMATION_CODE_LIFETIME', default=60))),
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = 'test@gmail.com'
+
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100)),
+    'MAX_ATTEMPTS': int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)),
+    'RETRY_DELAY': int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', default=60)),
+    'POLL_INTERVAL': float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', default=5)),
+    'CLAIM_TIMEOUT': int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', default=300)),
+}
@@ -1,25 +1,116 @@
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import AutoField, IntegerField, Q
+from django.utils.functional import cached_property
 
 from .models import Category, Comment, Genre, Review, Title, User
 
 
+def estimated_count(queryset):
+    """
+    Оценка числа строк из плана запроса PostgreSQL: не читает таблицу,
+    в отличие от COUNT(*). Для других баз возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для больших выборок показывает оценку числа строк вместо точного
+    COUNT(*), который на миллионах строк читает всю таблицу. Небольшие
+    выборки считаются точно.
+    """
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate > self.exact_count_limit:
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Список для таблиц с миллионами строк: без точных COUNT(*), поэтому
+    даже поиск по вхождению не считает все совпадения. Префиксы
+    search_fields те же, что в Django: '^' — начало строки без учёта
+    регистра, '=' — точное совпадение без учёта регистра; для них на
+    PostgreSQL есть индексы по UPPER(). Числовые поля и внешние ключи
+    ищутся только по числовому запросу и по точному значению.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+    lookup_prefixes = {'^': 'istartswith', '=': 'iexact'}
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q()
+        for search_field in self.search_fields:
+            lookup = self.lookup_prefixes.get(search_field[0], 'icontains')
+            path = search_field.lstrip(''.join(self.lookup_prefixes))
+            field = get_fields_from_path(self.model, path)[-1]
+            if field.is_relation or isinstance(
+                field, (AutoField, IntegerField)
+            ):
+                if term.isdigit():
+                    condition |= Q(**{path: term})
+            else:
+                condition |= Q(**{f'{path}__{lookup}': term})
+        if not condition:
+            return queryset.none(), False
+        return queryset.filter(condition), False
+
+
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(LargeTableAdmin):
     list_display = ('pk', 'name', 'year',
                     'description', 'category')
+    list_select_related = ('category',)
     search_fields = ('name',)
     list_filter = ('year',)
     list_editable = ('category',)
-    empty_value_display = '-пусто-'
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по названию и описанию через полнотекстовый индекс.
+        """
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """
+        Варианты категорий загружаются один раз при создании класса
+        формы: копии поля в редактируемых строках списка не выполняют
+        запрос каждая.
+        """
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'category':
+            field.choices = list(field.choices)
+        return field
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ('pk', 'title', 'text', 'author',
                     'score', 'pub_date')
-    search_fields = ('title',)
+    list_select_related = ('title', 'author')
+    raw_id_fields = ('title', 'author')
+    search_fields = ('title', '^author__username')
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
 
 
 @admin.register(Category)
@@ -37,17 +128,17 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'author', 'pub_date', 'review')
-    search_fields = ('text',)
+    list_select_related = ('author', 'review__title', 'review__author')
+    raw_id_fields = ('review', 'author')
+    search_fields = ('review', '^author__username')
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = ('username', 'email', 'first_name',
                     'last_name', 'bio', 'role', 'is_staff')
-    search_fields = ('username',)
+    search_fields = ('^username', '^email')
     list_filter = ('role',)
-    empty_value_display = '-пусто-'
@@ -0,0 +1,254 @@
+import csv
+import datetime
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title, User
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FORMATS = (CSV, NDJSON)
+GENRE_SEPARATOR = ','
+
+
+class ModelSpec:
+    """
+    Описание колонок выгрузки модели. relations сопоставляет колонке
+    атрибут внешнего ключа, связанную модель и её естественный ключ
+    (slug, username); если ключ None, в колонке указан id.
+    """
+    def __init__(self, model, fields, relations=None, with_genres=False):
+        self.model = model
+        self.fields = fields
+        self.relations = relations or {}
+        self.with_genres = with_genres
+
+    @property
+    def columns(self):
+        columns = self.fields + tuple(self.relations)
+        if self.with_genres:
+            columns += ('genre',)
+        return columns
+
+
+SPECS = {
+    'category': ModelSpec(Category, ('id', 'name', 'slug')),
+    'genre': ModelSpec(Genre, ('id', 'name', 'slug')),
+    'user': ModelSpec(
+        User,
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name')
+    ),
+    'title': ModelSpec(
+        Title, ('id', 'name', 'year', 'description'),
+        relations={'category': ('category_id', Category, 'slug')},
+        with_genres=True,
+    ),
+    'review': ModelSpec(
+        Review, ('id', 'text', 'score', 'pub_date'),
+        relations={
+            'title': ('title_id', Title, None),
+            'author': ('author_id', User, 'username'),
+        },
+    ),
+    'comment': ModelSpec(
+        Comment, ('id', 'text', 'pub_date'),
+        relations={
+            'review': ('review_id', Review, None),
+            'author': ('author_id', User, 'username'),
+        },
+    ),
+}
+
+
+def read_rows(stream, data_format):
+    """
+    Лениво читает строки CSV с заголовком или NDJSON по одной.
+    """
+    if data_format == CSV:
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def preserve_auto_now(model):
+    """
+    Отключает auto_now_add, чтобы сохранить даты из выгрузки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class RowConverter:
+    """
+    Превращает строки выгрузки в объекты модели. Естественные ключи
+    разрешаются через словари ключ -> id, загруженные один раз
+    на весь импорт. Строки без обязательных полей отклоняются до записи,
+    пустая дата публикации заменяется временем загрузки.
+    """
+    def __init__(self, spec):
+        self.spec = spec
+        self.auto_now_fields = [
+            field.name for field in spec.model._meta.concrete_fields
+            if getattr(field, 'auto_now_add', False)
+        ]
+        self.key_maps = {}
+        for _, related_model, key in spec.relations.values():
+            if key is not None:
+                self.key_maps[related_model] = dict(
+                    related_model.objects.values_list(key, 'id')
+                )
+        if spec.with_genres:
+            self.key_maps[Genre] = dict(
+                Genre.objects.values_list('slug', 'id')
+            )
+
+    def resolve(self, related_model, value):
+        if related_model not in self.key_maps:
+            return int(value)
+        try:
+            return self.key_maps[related_model][value]
+        except KeyError:
+            raise ValueError(
+                f'{related_model._meta.verbose_name} «{value}» не найден'
+            )
+
+    def genre_ids(self, row):
+        genres = row.get('genre') or []
+        if isinstance(genres, str):
+            genres = [slug for slug in genres.split(GENRE_SEPARATOR) if slug]
+        return [self.resolve(Genre, slug) for slug in genres]
+
+    def convert(self, row):
+        """
+        Возвращает объект модели и список id жанров для произведения.
+        """
+        opts = self.spec.model._meta
+        values = {}
+        for name in self.spec.fields:
+            value = row.get(name)
+            if value in (None, ''):
+                continue
+            values[name] = opts.get_field(name).to_python(value)
+        for column, (attname, related_model, _) in (
+            self.spec.relations.items()
+        ):
+            value = row.get(column)
+            if value not in (None, ''):
+                values[attname] = self.resolve(related_model, value)
+            elif not opts.get_field(column).null:
+                raise ValueError(f'не указано поле {column}')
+        for name in self.auto_now_fields:
+            values.setdefault(name, timezone.now())
+        if self.spec.model is User:
+            values['password'] = make_password(None)
+        instance = self.spec.model(**values)
+        instance.clean_fields(exclude=[
+            field.name for field in opts.fields if field.is_relation
+        ])
+        genres = self.genre_ids(row) if self.spec.with_genres else []
+        return instance, genres
+
+    def missing_parents(self, instances):
+        """
+        Одним запросом на связь проверяет, что родители, заданные по id,
+        существуют. Возвращает множество объектов без родителя.
+        """
+        missing = set()
+        for attname, related_model, key in self.spec.relations.values():
+            if key is not None:
+                continue
+            ids = {getattr(instance, attname) for instance in instances}
+            existing = set(related_model.objects.filter(
+                pk__in=ids
+            ).values_list('pk', flat=True))
+            missing.update(
+                index for index, instance in enumerate(instances)
+                if getattr(instance, attname) not in existing
+            )
+        return missing
+
+
+def export_rows(spec, chunk_size):
+    """
+    Выгружает модель порциями по первичному ключу, не загружая таблицу
+    в память целиком.
+    """
+    lookups = {name: name for name in spec.fields}
+    for column, (attname, related_model, key) in spec.relations.items():
+        lookups[column] = (
+            attname if key is None else f'{column}__{key}'
+        )
+    queryset = spec.model.objects.order_by('pk').values(*lookups.values())
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1]['id']
+        genres = {}
+        if spec.with_genres:
+            through = Title.genre.through.objects.filter(
+                title_id__in=[values['id'] for values in chunk]
+            ).order_by('genre__slug').values_list('title_id', 'genre__slug')
+            for title_id, slug in through:
+                genres.setdefault(title_id, []).append(slug)
+        for values in chunk:
+            row = {
+                column: values[lookup] for column, lookup in lookups.items()
+            }
+            if spec.with_genres:
+                row['genre'] = genres.get(values['id'], [])
+            yield row
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """
+    Даты выгружаются с микросекундами: DjangoJSONEncoder округляет их
+    до миллисекунд, и повторная загрузка меняла бы pub_date.
+    """
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def write_rows(stream, rows, columns, data_format):
+    if data_format == NDJSON:
+        for row in rows:
+            stream.write(
+                json.dumps(row, cls=ExportJSONEncoder, ensure_ascii=False)
+            )
+            stream.write('\n')
+        return
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    for row in rows:
+        if isinstance(row.get('genre'), list):
+            row['genre'] = GENRE_SEPARATOR.join(row['genre'])
+        writer.writerow(row)
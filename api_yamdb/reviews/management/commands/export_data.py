@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from reviews.bulk import CSV, FORMATS, SPECS, export_rows, write_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает модель в CSV или NDJSON в формате, '
+        'который принимает import_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(SPECS))
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument('--format', choices=FORMATS, default=CSV)
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество строк, читаемых из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        spec = SPECS[options['model']]
+        rows = export_rows(spec, options['chunk_size'])
+        if options['output'] is None:
+            write_rows(sys.stdout, rows, spec.columns, options['format'])
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as stream:
+            write_rows(stream, rows, spec.columns, options['format'])
@@ -0,0 +1,161 @@
+import json
+import os
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.bulk import (FORMATS, SPECS, RowConverter, batches,
+                          preserve_auto_now, read_rows)
+from reviews.models import Title
+from reviews.signals import bulk_saved
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает выгрузку CSV или NDJSON в базу порциями '
+        'через bulk_create. Категории и жанры задаются slug, авторы — '
+        'username, произведения и отзывы — id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(SPECS))
+        parser.add_argument('path', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; по умолчанию <path>.checkpoint.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с последней сохранённой контрольной точки.'
+        )
+        parser.add_argument(
+            '--skip-existing', action='store_true',
+            help=(
+                'Пропускать строки, нарушающие уникальность, например '
+                'при повторной загрузке уже сохранённой порции.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        spec = SPECS[options['model']]
+        path = options['path']
+        data_format = options['format'] or os.path.splitext(path)[1][1:]
+        if data_format not in FORMATS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть не меньше 1.')
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        done = self.read_checkpoint(checkpoint) if options['resume'] else 0
+        converter = RowConverter(spec)
+        created = skipped = 0
+        # bulk_create с ignore_conflicts не сообщает, сколько строк
+        # вставлено на самом деле: их число считается по таблице.
+        existing = (
+            spec.model.objects.count() if options['skip_existing'] else None
+        )
+        with open(path, encoding='utf-8', newline='') as stream:
+            rows = islice(
+                enumerate(read_rows(stream, data_format), 1), done, None
+            )
+            with preserve_auto_now(spec.model):
+                for batch in batches(rows, options['batch_size']):
+                    instances, genres = self.convert_batch(converter, batch)
+                    self.save_batch(
+                        spec, instances, genres, options['skip_existing']
+                    )
+                    created += len(instances)
+                    skipped += len(batch) - len(instances)
+                    done = batch[-1][0]
+                    self.write_checkpoint(checkpoint, options['model'], done)
+        if existing is not None:
+            inserted = spec.model.objects.count() - existing
+            skipped += created - inserted
+            created = inserted
+        self.reset_sequence(spec.model)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {created}, пропущено: {skipped}'
+        ))
+
+    def convert_batch(self, converter, batch):
+        """
+        Превращает порцию строк в объекты, сообщая о пропущенных строках.
+        """
+        numbers, instances, genres = [], [], []
+        for number, row in batch:
+            try:
+                instance, genre_ids = converter.convert(row)
+            except (ValueError, ValidationError) as error:
+                self.stderr.write(f'Строка {number}: {error}')
+                continue
+            numbers.append(number)
+            instances.append(instance)
+            genres.append(genre_ids)
+        missing = converter.missing_parents(instances)
+        for index in sorted(missing):
+            self.stderr.write(
+                f'Строка {numbers[index]}: связанный объект не найден'
+            )
+        return (
+            [item for index, item in enumerate(instances)
+             if index not in missing],
+            [item for index, item in enumerate(genres)
+             if index not in missing],
+        )
+
+    @transaction.atomic
+    def save_batch(self, spec, instances, genres, skip_existing):
+        spec.model.objects.bulk_create(
+            instances, ignore_conflicts=skip_existing
+        )
+        if spec.with_genres:
+            links = []
+            for title, genre_ids in zip(instances, genres):
+                if genre_ids and title.pk is None:
+                    raise CommandError(
+                        'Чтобы привязать жанры, укажите id произведений.'
+                    )
+                links.extend(
+                    Title.genre.through(title_id=title.pk, genre_id=genre_id)
+                    for genre_id in genre_ids
+                )
+            Title.genre.through.objects.bulk_create(
+                links, ignore_conflicts=skip_existing
+            )
+        if spec.model._meta.model_name == 'review':
+            Title.objects.filter(
+                pk__in={review.title_id for review in instances}
+            ).refresh_rating()
+        bulk_saved.send(sender=spec.model, instances=instances)
+
+    @staticmethod
+    def read_checkpoint(checkpoint):
+        try:
+            with open(checkpoint) as stream:
+                return json.load(stream)['rows']
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def write_checkpoint(checkpoint, model, rows):
+        with open(f'{checkpoint}.tmp', 'w') as stream:
+            json.dump({'model': model, 'rows': rows}, stream)
+        os.replace(f'{checkpoint}.tmp', checkpoint)
+
+    @staticmethod
+    def reset_sequence(model):
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет сохранённые рейтинги произведений с отзывами '
+        'и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать рейтинг всех произведений без сверки.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать произведения с расхождениями.'
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            updated = Title.objects.refresh_rating()
+            self.stdout.write(f'Пересчитано произведений: {updated}')
+            return
+        drifted = list(
+            Title.objects.annotate(
+                actual_sum=Coalesce(Sum('reviews__score'), 0),
+                actual_count=Count('reviews'),
+            ).exclude(
+                score_sum=F('actual_sum'), review_count=F('actual_count')
+            ).order_by().values_list('pk', flat=True)
+        )
+        self.stdout.write(f'Произведений с расхождениями: {len(drifted)}')
+        if drifted and not options['dry_run']:
+            Title.objects.filter(pk__in=drifted).refresh_rating()
+            self.stdout.write(self.style.SUCCESS('Рейтинги исправлены.'))
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE reviews_title ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A')
+            || setweight(
+                to_tsvector('russian', coalesce(NEW.description, '')), 'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER reviews_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update()
+    """,
+    'UPDATE reviews_title SET name = name',
+    'CREATE INDEX reviews_title_search_vector_idx '
+    'ON reviews_title USING gin (search_vector)',
+    'CREATE INDEX reviews_title_name_trgm_idx '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+)
+
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger '
+    'ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector_update()',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Полнотекстовый индекс произведений для PostgreSQL: столбец tsvector,
+    обновляемый триггером, GIN-индекс по нему и триграммный индекс по
+    названию. На SQLite индекс FTS5 создаётся после миграций, см.
+    reviews.search.setup_sqlite_fts.
+    """
+
+    dependencies = [
+        ('reviews', '0008_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgresql(POSTGRESQL_FORWARD),
+            run_postgresql(POSTGRESQL_BACKWARD),
+        ),
+    ]
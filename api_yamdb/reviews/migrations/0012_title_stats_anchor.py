@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:56
+
+import time
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_recent_sums(apps, schema_editor):
+    """
+    Пересчитывает суммы весов недавнего среднего относительно текущего
+    момента вместо фиксированной даты.
+    """
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    now = time.time()
+    half_life = settings.REVIEW_STATS['RECENT_HALF_LIFE_DAYS'] * 86400
+    sums = {}
+    reviews = Review.objects.order_by().values_list(
+        'title_id', 'score', 'pub_date'
+    )
+    for title_id, score, pub_date in reviews.iterator():
+        exponent = max((pub_date.timestamp() - now) / half_life, -1000.0)
+        weight = 2 ** min(exponent, 0.0)
+        score_sum, weight_sum = sums.get(title_id, (0.0, 0.0))
+        sums[title_id] = (score_sum + score * weight, weight_sum + weight)
+    for title_id, (score_sum, weight_sum) in sums.items():
+        TitleStats.objects.filter(title_id=title_id).update(
+            recent_score_sum=score_sum, recent_weight=weight_sum,
+            recent_anchor=now,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titlestats',
+            name='recent_anchor',
+            field=models.FloatField(default=0, verbose_name='Момент отсчёта весов (Unix time)'),
+        ),
+        migrations.RunPython(fill_recent_sums, migrations.RunPython.noop),
+    ]
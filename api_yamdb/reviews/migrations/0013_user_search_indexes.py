@@ -0,0 +1,41 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    'CREATE INDEX reviews_user_username_upper_idx '
+    'ON reviews_user (UPPER(username::text) text_pattern_ops)',
+    'CREATE INDEX reviews_user_email_upper_idx '
+    'ON reviews_user (UPPER(email::text) text_pattern_ops)',
+)
+
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS reviews_user_username_upper_idx',
+    'DROP INDEX IF EXISTS reviews_user_email_upper_idx',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Индексы для поиска пользователей в админке по началу username и email
+    без учёта регистра: Django строит для istartswith и iexact условие
+    UPPER(col::text) LIKE UPPER(%s), которое обычный индекс не использует.
+    """
+
+    dependencies = [
+        ('reviews', '0012_title_stats_anchor'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgresql(POSTGRESQL_FORWARD),
+            run_postgresql(POSTGRESQL_BACKWARD),
+        ),
+    ]
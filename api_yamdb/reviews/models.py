@@ -1,10 +1,18 @@
 import datetime as dt
+import time
 
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
 from django.db.models.constraints import UniqueConstraint
+from django.db.models.functions import Cast, Coalesce, Greatest, Power
+
+from .search import search_titles
+from .stats import (MIN_EXPONENT, SCORES, decay, half_life_seconds,
+                    histogram_median, review_weight)
 
 USER = 'user'
 MODERATOR = 'moderator'
@@ -55,6 +63,13 @@ class User(AbstractUser):
         ordering = ('username',)
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+        indexes = [
+            models.Index(
+                fields=['role', 'username'],
+                name='user_privileged_username_idx',
+                condition=~Q(role=USER),
+            ),
+        ]
 
 
 class Category(models.Model):
@@ -87,6 +102,55 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def search(self, text):
+        """
+        Полнотекстовый поиск по названию и описанию с ранжированием.
+        """
+        return search_titles(self, text)
+
+    def shift_rating(self, score_delta, count_delta):
+        """
+        Сдвигает сохранённые сумму оценок и число отзывов на заданные
+        величины и пересчитывает рейтинг одним UPDATE.
+        """
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=Case(
+                When(review_count=-count_delta, then=Value(None)),
+                default=Cast(score_sum, FloatField()) / review_count,
+                output_field=FloatField(),
+            ),
+        )
+
+    def refresh_rating(self):
+        """
+        Пересчитывает сумму оценок, число отзывов, рейтинг и статистику
+        оценок по таблице отзывов.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        TitleStats.objects.rebuild(self)
+        return self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(value=Sum('score')).values('value')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('pk')).values('value')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(value=Avg('score')).values('value'),
+                output_field=FloatField()
+            ),
+        )
+
+
 class Title(models.Model):
     name = models.TextField(verbose_name='Название')
     year = models.IntegerField(
@@ -108,11 +172,32 @@ class Title(models.Model):
         Category, on_delete=models.SET_NULL, null=True, related_name='titles',
         verbose_name='Категория'
     )
+    rating = models.FloatField(
+        verbose_name='Рейтинг', blank=True, null=True, editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0, editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов', default=0, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-year', 'category')
+        ordering = ('-year', 'category_id', 'id')
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['-year', 'category', 'id'],
+                name='title_year_category_id_idx'
+            ),
+            models.Index(
+                fields=['category', '-year', 'id'],
+                name='title_category_year_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -139,10 +224,23 @@ class Review(models.Model):
         verbose_name='Дата публикации', auto_now_add=True
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_id_idx'
+            ),
+            models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ]
         constraints = [
             UniqueConstraint(
                 fields=['title', 'author'],
@@ -159,6 +257,145 @@ class Review(models.Model):
         )
 
 
+class TitleStatsManager(models.Manager):
+    def shift(self, title_id, removed=None, added=None):
+        """
+        Учитывает удалённый и добавленный отзывы, заданные парами
+        (оценка, дата публикации), одним UPDATE строки статистики.
+        Строка создаётся при первом отзыве на произведение; при удалении
+        произведения она уже удалена каскадом и не создаётся заново.
+        """
+        now = time.time()
+        counts = dict.fromkeys(SCORES, 0)
+        score_sum = weight = 0.0
+        for review, sign in ((removed, -1), (added, 1)):
+            if review is not None:
+                score, pub_date = review
+                counts[score] += sign
+                weight += sign * review_weight(pub_date, now)
+                score_sum += sign * score * review_weight(pub_date, now)
+        values = {
+            f'score_{score}': F(f'score_{score}') + delta
+            for score, delta in counts.items() if delta
+        }
+        # Суммы весов переносятся от прежнего момента отсчёта к текущему
+        # в том же UPDATE.
+        factor = Power(
+            Value(2.0, output_field=FloatField()),
+            Greatest(
+                (F('recent_anchor') - Value(now, output_field=FloatField()))
+                / Value(half_life_seconds(), output_field=FloatField()),
+                Value(MIN_EXPONENT, output_field=FloatField()),
+            ),
+        )
+        values['recent_score_sum'] = F('recent_score_sum') * factor + score_sum
+        values['recent_weight'] = F('recent_weight') * factor + weight
+        values['recent_anchor'] = now
+        rows = self.filter(title_id=title_id)
+        if not rows.update(**values) and added is not None:
+            self.get_or_create(title_id=title_id)
+            rows.update(**values)
+
+    @transaction.atomic(savepoint=False)
+    def rebuild(self, titles):
+        """
+        Пересоздаёт статистику произведений из queryset titles по таблице
+        отзывов.
+        """
+        stats = {}
+        now = time.time()
+        reviews = Review.objects.filter(title__in=titles).order_by(
+        ).values_list('title_id', 'score', 'pub_date')
+        for title_id, score, pub_date in reviews.iterator():
+            if title_id not in stats:
+                stats[title_id] = self.model(
+                    title_id=title_id, recent_anchor=now
+                )
+            stats[title_id].add(score, pub_date)
+        self.filter(title__in=titles).delete()
+        self.bulk_create(stats.values())
+
+
+class TitleStats(models.Model):
+    """
+    Распределение оценок произведения в одной строке фиксированного
+    размера: число оценок каждого балла и суммы для недавнего среднего.
+    Обновляется вместе с рейтингом при каждом изменении отзыва.
+    """
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats', verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    recent_score_sum = models.FloatField(default=0)
+    recent_weight = models.FloatField(default=0)
+    recent_anchor = models.FloatField(
+        verbose_name='Момент отсчёта весов (Unix time)', default=0
+    )
+
+    objects = TitleStatsManager()
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return f'Статистика оценок {self.title_id}'
+
+    def add(self, score, pub_date):
+        field = f'score_{score}'
+        setattr(self, field, getattr(self, field) + 1)
+        weight = review_weight(pub_date, self.recent_anchor)
+        self.recent_weight += weight
+        self.recent_score_sum += score * weight
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        histogram = self.histogram
+        count = sum(histogram.values())
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in histogram.items()
+        ) / count
+
+    @property
+    def median(self):
+        return histogram_median(self.histogram)
+
+    @property
+    def recent_average(self):
+        if not self.count or self.recent_weight <= 0:
+            return None
+        return self.recent_score_sum / self.recent_weight
+
+    @property
+    def recent_count(self):
+        """
+        Эффективное число недавних отзывов: сумма их весов на сегодня.
+        """
+        return max(
+            self.recent_weight * decay(self.recent_anchor, time.time()), 0.0
+        )
+
+
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
     author = models.ForeignKey(
@@ -177,6 +414,13 @@ class Comment(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_id_idx'
+            ),
+            models.Index(fields=['pub_date'], name='comment_pub_date_idx'),
+        ]
 
     def __str__(self):
         return (
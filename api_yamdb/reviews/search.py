@@ -0,0 +1,104 @@
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'reviews_title_fts'
+FTS_TRIGGERS = tuple(
+    f'{FTS_TABLE}_{event}' for event in ('insert', 'delete', 'update')
+)
+
+SQLITE_FTS_SETUP = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    "AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    "AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    "AFTER UPDATE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+def setup_sqlite_fts(using):
+    """
+    Создаёт индекс FTS5 и триггеры синхронизации для локального запуска
+    на SQLite. Пересоздание таблицы reviews_title при миграциях удаляет
+    триггеры, поэтому функция вызывается после каждой миграции.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        if set(FTS_TRIGGERS) <= {name for name, in cursor.fetchall()}:
+            return
+        for statement in SQLITE_FTS_SETUP:
+            cursor.execute(statement)
+
+
+def fts5_query(text):
+    """
+    Превращает пользовательский ввод в запрос FTS5: каждое слово ищется
+    как префикс, спецсимволы синтаксиса FTS5 отбрасываются.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """
+    Фильтрует произведения по названию и описанию и сортирует их
+    по релевантности (аннотация search_rank).
+    """
+    text = text.strip()
+    if not text:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        queryset = queryset.extra(
+            where=[
+                f'{table}.search_vector @@ {tsquery} '
+                f'OR {table}.name %% %s'
+            ],
+            params=[text, text],
+        ).annotate(search_rank=RawSQL(
+            f'ts_rank({table}.search_vector, {tsquery}) '
+            f'+ similarity({table}.name, %s)',
+            (text, text), output_field=FloatField()
+        ))
+    elif vendor == 'sqlite':
+        query = fts5_query(text)
+        if not query:
+            return queryset.none()
+        queryset = queryset.extra(
+            where=[
+                f'{table}.id IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[query],
+        ).annotate(search_rank=RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id)',
+            (query,), output_field=FloatField()
+        ))
+    else:
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    return queryset.order_by('-search_rank', 'pk')
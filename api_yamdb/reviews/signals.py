@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Review, Title, TitleStats
+from .search import setup_sqlite_fts
+
+# Отправляется после bulk_create, который не вызывает post_save.
+bulk_saved = Signal(providing_args=['instances'])
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Учитывает новый или изменённый отзыв в рейтинге и статистике оценок
+    произведения.
+    """
+    titles = Title.objects.filter(pk=instance.title_id)
+    loaded = getattr(instance, '_loaded_values', {})
+    review = (instance.score, instance.pub_date)
+    if created:
+        titles.shift_rating(instance.score, 1)
+        TitleStats.objects.shift(instance.title_id, added=review)
+    elif not {'score', 'title_id', 'pub_date'} <= set(loaded):
+        titles.refresh_rating()
+    elif loaded['title_id'] != instance.title_id:
+        old_review = (loaded['score'], loaded['pub_date'])
+        Title.objects.filter(pk=loaded['title_id']).shift_rating(
+            -loaded['score'], -1
+        )
+        TitleStats.objects.shift(loaded['title_id'], removed=old_review)
+        titles.shift_rating(instance.score, 1)
+        TitleStats.objects.shift(instance.title_id, added=review)
+    elif review != (loaded['score'], loaded['pub_date']):
+        titles.shift_rating(instance.score - loaded['score'], 0)
+        TitleStats.objects.shift(
+            instance.title_id,
+            removed=(loaded['score'], loaded['pub_date']), added=review
+        )
+    instance._loaded_values = {
+        'title_id': instance.title_id, 'score': instance.score,
+        'pub_date': instance.pub_date,
+    }
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Исключает удалённый отзыв из рейтинга и статистики произведения,
+    в том числе при массовом и каскадном удалении.
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    title_id = loaded.get('title_id', instance.title_id)
+    score = loaded.get('score', instance.score)
+    Title.objects.filter(pk=title_id).shift_rating(-score, -1)
+    TitleStats.objects.shift(
+        title_id, removed=(score, loaded.get('pub_date', instance.pub_date))
+    )
+
+
+@receiver(post_migrate)
+def setup_search_index(sender, using, **kwargs):
+    if sender.name == 'reviews':
+        setup_sqlite_fts(using)
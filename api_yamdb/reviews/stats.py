@@ -0,0 +1,52 @@
+from django.conf import settings
+
+SCORES = range(1, 11)
+# Ниже этого показателя степени вес считается нулевым: PostgreSQL
+# выдаёт ошибку при исчезновении порядка в POWER.
+MIN_EXPONENT = -1000.0
+
+
+def half_life_seconds():
+    return settings.REVIEW_STATS['RECENT_HALF_LIFE_DAYS'] * 86400
+
+
+def review_weight(pub_date, anchor):
+    """
+    Вес отзыва в недавнем среднем относительно момента anchor (Unix
+    time): 1 для отзыва, опубликованного в anchor, и вдвое меньше за
+    каждый период полураспада до него. Суммы весов в TitleStats
+    отсчитываются от момента их последнего изменения, поэтому не
+    превышают числа отзывов и не переполняются со временем.
+    """
+    exponent = (pub_date.timestamp() - anchor) / half_life_seconds()
+    return 2 ** min(max(exponent, MIN_EXPONENT), 0.0)
+
+
+def decay(anchor, now):
+    """
+    Множитель, переносящий суммы весов от момента anchor к моменту now.
+    """
+    exponent = (anchor - now) / half_life_seconds()
+    return 2 ** min(max(exponent, MIN_EXPONENT), 0.0)
+
+
+def score_at(counts, position):
+    seen = 0
+    for score in SCORES:
+        seen += counts[score]
+        if seen > position:
+            return score
+    return None
+
+
+def histogram_median(counts):
+    """
+    Медиана по числу оценок каждого балла: O(10) вместо сортировки
+    отзывов.
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    return (
+        score_at(counts, (total - 1) // 2) + score_at(counts, total // 2)
+    ) / 2
@@ -1,9 +1,58 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+TEST_DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """
+    Тесты с базой данных работают на SQLite в памяти и не требуют
+    PostgreSQL. Подменяются настройки подключений, а не модуль settings,
+    чтобы не влиять на проверку конфигурации в test_settings.py.
+    Вторая база replica нужна тестам маршрутизации чтений в реплики.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    for alias, options in TEST_DATABASES.items():
+        settings.DATABASES.setdefault(alias, dict(options))
+
+    connections.__dict__['databases'] = {
+        alias: dict(options) for alias, options in TEST_DATABASES.items()
+    }
+    for alias in TEST_DATABASES:
+        if hasattr(connections._connections, alias):
+            delattr(connections._connections, alias)
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    from api.cache import response_cache
+
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_buckets():
+    from api.throttling import bucket_store
+
+    bucket_store.clear()
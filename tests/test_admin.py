@@ -0,0 +1,113 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from reviews import admin as reviews_admin
+from reviews.models import Category, Comment, Review, Title, User
+
+
+def fill_database(size):
+    for index in range(Title.objects.count(), size):
+        category = Category.objects.create(
+            name=f'Категория {index}', slug=f'category-{index}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {index}', year=2000, category=category
+        )
+        author = User.objects.create(
+            username=f'user{index}', email=f'user{index}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Текст', score=5
+        )
+        Comment.objects.create(review=review, author=author, text='Текст')
+
+
+def count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+
+    @pytest.mark.parametrize('model', ['title', 'review', 'comment', 'user'])
+    def test_changelist_queries_do_not_grow(self, admin_client, model):
+        url = reverse(f'admin:reviews_{model}_changelist')
+        fill_database(2)
+        small, _ = count_queries(admin_client, url)
+        fill_database(8)
+        queries, _ = count_queries(admin_client, url)
+        assert queries == small, (
+            f'Число запросов к БД в списке `{url}` растёт вместе с числом '
+            f'строк: {small} -> {queries}. Проверьте list_select_related'
+        )
+
+    def test_review_search_by_title_id_and_username(self, admin_client):
+        fill_database(3)
+        url = reverse('admin:reviews_review_changelist')
+        title = Title.objects.get(name='Произведение 1')
+        for term in (str(title.pk), 'user1'):
+            _, response = count_queries(admin_client, url, {'q': term})
+            assert [review.title_id for review in response.context[
+                'cl'
+            ].result_list] == [title.pk], (
+                'Проверьте поиск отзывов по id произведения и username'
+            )
+
+    def test_user_search_by_prefix_ignores_case(self, admin_client):
+        fill_database(3)
+        url = reverse('admin:reviews_user_changelist')
+        for term in ('USER1', 'User1@yamdb'):
+            _, response = count_queries(admin_client, url, {'q': term})
+            assert [user.username for user in response.context[
+                'cl'
+            ].result_list] == ['user1'], (
+                'Проверьте поиск пользователей по началу username и email '
+                'без учёта регистра'
+            )
+
+    def test_comment_search_skips_text(self, admin_client):
+        fill_database(3)
+        Comment.objects.filter(author__username='user2').update(
+            text='Отличная режиссура'
+        )
+        url = reverse('admin:reviews_comment_changelist')
+        for term, authors in (('USER2', ['user2']), ('режисс', [])):
+            _, response = count_queries(admin_client, url, {'q': term})
+            assert [comment.author.username for comment in response.context[
+                'cl'
+            ].result_list] == authors, (
+                'Проверьте, что комментарии ищутся по началу username, '
+                'а не полным просмотром текста'
+            )
+
+    def test_title_search_uses_full_text_index(self, admin_client):
+        fill_database(3)
+        _, response = count_queries(
+            admin_client, reverse('admin:reviews_title_changelist'),
+            {'q': 'Произведение'}
+        )
+        assert len(response.context['cl'].result_list) == 3
+
+
+@pytest.mark.django_db
+def test_paginator_uses_estimate_for_large_tables(monkeypatch):
+    fill_database(2)
+    monkeypatch.setattr(
+        reviews_admin, 'estimated_count', lambda queryset: 5000000
+    )
+    paginator = reviews_admin.EstimatedCountPaginator(
+        Review.objects.all(), 100
+    )
+    with CaptureQueriesContext(connection) as context:
+        assert paginator.count == 5000000
+    assert not context.captured_queries, (
+        'Проверьте, что для больших таблиц не выполняется COUNT(*)'
+    )
+    monkeypatch.setattr(reviews_admin, 'estimated_count', lambda queryset: 10)
+    assert reviews_admin.EstimatedCountPaginator(
+        Review.objects.all(), 100
+    ).count == 2
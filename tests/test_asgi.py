@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+from api.asgi import AsyncGateway, build_environ
+from django.core.wsgi import get_wsgi_application
+
+
+def call(application, scope, body=b''):
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+def http_scope(method, path, headers=()):
+    return {
+        'type': 'http', 'method': method, 'path': path,
+        'query_string': b'', 'headers': list(headers),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+    }
+
+
+class TestBuildEnviron:
+
+    def test_headers(self):
+        environ = build_environ(http_scope('POST', '/api/v1/', headers=[
+            (b'content-type', b'application/json'),
+            (b'accept-encoding', b'gzip'),
+        ]), b'{}')
+        assert environ['CONTENT_TYPE'] == 'application/json'
+        assert environ['HTTP_ACCEPT_ENCODING'] == 'gzip'
+        assert environ['wsgi.input'].read() == b'{}'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncGateway:
+
+    def test_read_and_write_requests(self, settings):
+        settings.ALLOWED_HOSTS = ['testserver']
+        application = AsyncGateway(
+            get_wsgi_application(), read_threads=2, write_threads=1
+        )
+        sent = call(application, http_scope('GET', '/api/v1/titles/'))
+        assert sent[0]['status'] == 200, (
+            'Проверьте, что ASGI-приложение отдаёт список произведений'
+        )
+        assert json.loads(sent[1]['body'])['count'] == 0
+        sent = call(application, http_scope(
+            'POST', '/api/v1/auth/signup/',
+            headers=[(b'content-type', b'application/json')]
+        ), b'{}')
+        assert sent[0]['status'] == 400, (
+            'Проверьте, что тело запроса передаётся представлению'
+        )
@@ -0,0 +1,190 @@
+import re
+
+from unittest.mock import patch
+
+import pytest
+from api.authentication import TokenClaimsAuthentication
+from api.models import ConfirmationCode, OutgoingEmail
+from api.views import self_user
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.crypto import constant_time_compare
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from reviews.models import User
+
+
+def signup(client, username='newuser'):
+    response = client.post(
+        '/api/v1/auth/signup/',
+        {'username': username, 'email': f'{username}@yamdb.fake'}
+    )
+    assert response.status_code == 200, (
+        'Проверьте, что регистрация возвращает статус 200'
+    )
+    body = OutgoingEmail.objects.filter(
+        recipient=f'{username}@yamdb.fake'
+    ).latest('pk').body
+    return re.search(r'код подтверждения: (\S+)', body).group(1)
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def test_code_is_short_and_does_not_touch_password(self):
+        client = APIClient()
+        code = signup(client)
+        assert len(code) <= 10, (
+            'Проверьте, что код подтверждения короткий, а не хэш пароля'
+        )
+        assert not User.objects.get(username='newuser').has_usable_password()
+        user = User.objects.create(
+            username='member', email='member@yamdb.fake'
+        )
+        user.set_unusable_password()
+        user.save()
+        password = user.password
+        signup(client, 'member')
+        user.refresh_from_db()
+        assert user.password == password, (
+            'Проверьте, что выдача кода не меняет пароль пользователя'
+        )
+        assert not user.has_usable_password()
+
+    def test_code_issues_token_once(self):
+        client = APIClient()
+        code = signup(client)
+        data = {'username': 'newuser', 'confirmation_code': code}
+        response = client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 200 and 'token' in response.json()
+        response = client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+
+    def test_wrong_or_replaced_code_is_rejected(self):
+        client = APIClient()
+        with patch('api.models.get_random_string',
+                   side_effect=['AAAA2222', 'BBBB3333']):
+            assert (signup(client), signup(client)) == (
+                'AAAA2222', 'BBBB3333'
+            )
+        url = '/api/v1/auth/token/'
+        for code in ('AAAA2222', 'WRONG'):
+            response = client.post(
+                url, {'username': 'newuser', 'confirmation_code': code}
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что повторная регистрация заменяет код'
+            )
+        response = client.post(
+            url, {'username': 'newuser', 'confirmation_code': 'BBBB3333'}
+        )
+        assert response.status_code == 200
+
+    def test_concurrent_redeem_succeeds_once(self):
+        code = signup(APIClient())
+        user = User.objects.get(username='newuser')
+        results = []
+
+        def redeem_in_between(*args):
+            # Второй запрос с тем же кодом успевает погасить его между
+            # чтением и удалением в первом.
+            with patch('api.models.constant_time_compare',
+                       constant_time_compare):
+                results.append(ConfirmationCode.objects.redeem(user, code))
+            return constant_time_compare(*args)
+
+        with patch('api.models.constant_time_compare',
+                   side_effect=redeem_in_between):
+            results.append(ConfirmationCode.objects.redeem(user, code))
+        assert results == [True, False], (
+            'Проверьте, что один код не принимается дважды при параллельных '
+            'запросах'
+        )
+
+
+@pytest.mark.django_db
+class TestStatelessToken:
+
+    def get_token(self, client, username, role):
+        User.objects.create(
+            username=username, email=f'{username}@yamdb.fake', role=role
+        )
+        cache.clear()
+        code = signup(client, username)
+        response = client.post(
+            '/api/v1/auth/token/',
+            {'username': username, 'confirmation_code': code}
+        )
+        return response.json()['token']
+
+    def test_claims_replace_user_query_until_role_changes(self):
+        client = APIClient()
+        token = self.get_token(client, 'chief', 'admin')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with patch.object(APIView, 'authentication_classes',
+                          [TokenClaimsAuthentication]):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(
+                    '/api/v1/genres/', {'name': 'Жанр', 'slug': 'genre'}
+                )
+            assert response.status_code == 201
+            assert not any(
+                'reviews_user' in query['sql']
+                for query in context.captured_queries
+            ), 'Проверьте, что пользователь не загружается из базы'
+
+            user = User.objects.get(username='chief')
+            user.role = 'user'
+            user.save()
+            response = client.post(
+                '/api/v1/genres/', {'name': 'Жанр 2', 'slug': 'genre-2'}
+            )
+            assert response.status_code == 403, (
+                'Проверьте, что после смены роли claims токена '
+                'больше не используются'
+            )
+
+    def test_self_update_saves_over_current_row(self):
+        client = APIClient()
+        token = self.get_token(client, 'reader', 'user')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with patch.object(self_user.cls, 'authentication_classes',
+                          [TokenClaimsAuthentication]):
+            assert client.get('/api/v1/users/me/').status_code == 200
+            User.objects.filter(username='reader').update(bio='Из базы')
+            response = client.patch(
+                '/api/v1/users/me/', {'first_name': 'Имя'}
+            )
+        assert response.status_code == 200
+        user = User.objects.get(username='reader')
+        assert (user.first_name, user.bio) == ('Имя', 'Из базы'), (
+            'Проверьте, что PATCH /users/me/ не перезаписывает строку '
+            'копией пользователя из кэша'
+        )
+
+
+class TestUserCacheCheck:
+
+    def test_stateless_tokens_require_shared_cache(self, settings):
+        from api.checks import check_user_cache
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_AUTHENTICATION_CLASSES': [
+                'api.authentication.TokenClaimsAuthentication'
+            ],
+        }
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in check_user_cache(None)] == [
+            'api.E001'
+        ], 'Проверьте, что кэш одного процесса не допускается'
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        }}
+        assert check_user_cache(None) == []
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from api.benchmark import Benchmark
+from api.models import OutgoingEmail
+from django.core.management import call_command
+from reviews.models import Review, Title, User
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def test_benchmark_reports_every_scenario(self, tmp_path):
+        output = tmp_path / 'benchmark.json'
+        call_command(
+            'benchmark', generate=True, titles=5, reviews=12, users=2,
+            requests=6, output=str(output),
+        )
+        report = json.loads(output.read_text())
+        assert report['dataset']['titles'] == 5
+        assert Review.objects.count() == 12, (
+            'Проверьте, что отзывы, созданные сценарием, удаляются'
+        )
+        assert not User.objects.filter(
+            username__startswith='bench-run'
+        ).exists()
+        assert not OutgoingEmail.objects.filter(
+            recipient__startswith='bench-run'
+        ).exists(), 'Проверьте, что письма сценария signup удаляются'
+        assert sorted(report['scenarios']) == sorted(Benchmark.scenarios)
+        for name, result in report['scenarios'].items():
+            assert result['errors'] == 0, (
+                f'Проверьте, что сценарий `{name}` выполняется без ошибок'
+            )
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput'):
+                assert key in result
+            assert result['queries_mean'] is not None
+
+    def test_generated_ratings_match_reviews(self):
+        call_command(
+            'benchmark', generate=True, titles=3, reviews=7, users=1,
+            requests=1, scenario=['title_list'], output='/dev/null',
+        )
+        for title in Title.objects.all():
+            scores = list(title.reviews.values_list('score', flat=True))
+            assert title.review_count == len(scores)
+            assert title.score_sum == sum(scores)
+
+    def test_signup_baseline_rolls_back(self, capsys):
+        call_command('benchmark_signup', requests=2)
+        report = json.loads(capsys.readouterr().out)
+        assert sorted(report) == [
+            'confirmation_code', 'password_hash_code', 'signup_endpoint'
+        ]
+        assert not User.objects.exists()
+        assert not OutgoingEmail.objects.exists()
+
+    def test_signup_ignores_auth_throttles(self, capsys):
+        call_command('benchmark_signup', requests=25)
+        report = json.loads(capsys.readouterr().out)
+        assert report['signup_endpoint']['requests'] == 25, (
+            'Проверьте, что прогон длиннее лимита auth_ip не обрывается'
+        )
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import ADMIN, Category, Genre, Review, Title, User
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def setup_titles(self, count):
+        category = Category.objects.create(name='Фильм', slug='film')
+        return [
+            Title.objects.create(
+                name=f'Фильм {index}', year=2000, category=category
+            )
+            for index in range(count)
+        ]
+
+    def test_bulk_reviews_partial_failure(self):
+        titles = self.setup_titles(3)
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        Review.objects.create(
+            title=titles[2], author=author, text='Старый', score=1
+        )
+        client = APIClient()
+        client.force_authenticate(author)
+        payload = [
+            {'title': titles[0].pk, 'text': 'Отлично', 'score': 10},
+            {'title': titles[1].pk, 'text': 'Неплохо', 'score': 6},
+            {'title': titles[1].pk, 'text': 'Повтор', 'score': 6},
+            {'title': titles[2].pk, 'text': 'Уже есть', 'score': 5},
+            {'title': 999, 'text': 'Нет такого', 'score': 5},
+            {'title': titles[0].pk, 'text': 'Оценка', 'score': 11},
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                reverse('api:reviews-bulk'), payload, format='json'
+            )
+        assert response.status_code == 207, (
+            'Проверьте, что при частичном успехе возвращается статус 207'
+        )
+        statuses = [item['status'] for item in response.json()['results']]
+        assert statuses == [201, 201, 400, 400, 400, 400]
+        assert len(context.captured_queries) <= 14, (
+            'Проверьте, что пакет проверяется и сохраняется фиксированным '
+            'числом запросов'
+        )
+        created = response.json()['results'][0]['id']
+        assert Review.objects.get(pk=created).text == 'Отлично'
+        titles[0].refresh_from_db()
+        titles[1].refresh_from_db()
+        assert (titles[0].rating, titles[1].rating) == (10, 6), (
+            'Проверьте, что рейтинги пересчитываются после пакетной вставки'
+        )
+
+    def test_bulk_titles_admin_only(self):
+        Category.objects.create(name='Фильм', slug='film')
+        Genre.objects.create(name='Драма', slug='drama')
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=ADMIN
+        )
+        client = APIClient()
+        payload = [
+            {'name': 'Фильм', 'year': 2000, 'genre': ['drama'],
+             'category': 'film'},
+            {'name': 'Фильм', 'year': 2000, 'genre': ['comedy'],
+             'category': 'film'},
+        ]
+        url = reverse('api:titles-bulk')
+        client.force_authenticate(user)
+        assert client.post(url, payload, format='json').status_code == 403
+        client.force_authenticate(admin)
+        response = client.post(url, payload, format='json')
+        assert response.status_code == 207
+        results = response.json()['results']
+        assert 'genre' in results[1]['errors']
+        title = Title.objects.get(pk=results[0]['id'])
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+
+    def test_bulk_requires_list(self):
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(author)
+        response = client.post(
+            reverse('api:reviews-bulk'), {'title': 1}, format='json'
+        )
+        assert response.status_code == 400
@@ -0,0 +1,92 @@
+import gzip
+
+import pytest
+from api import compression
+from api.compression import CompressedStaticFilesStorage, choose_encoding
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Title
+
+
+class TestNegotiation:
+
+    def test_choose_encoding(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', object())
+        assert choose_encoding('gzip, deflate, br') == 'br'
+        assert choose_encoding('gzip;q=1, br;q=0.5') == 'gzip'
+        assert choose_encoding('br;q=0, *') == 'gzip'
+        assert choose_encoding('identity') is None
+        assert choose_encoding('') is None
+
+    def test_without_brotli(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+        assert choose_encoding('br') is None
+        assert choose_encoding('br, gzip') == 'gzip'
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+
+    def setup_titles(self, count):
+        category = Category.objects.create(name='Фильм', slug='film')
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {index}', year=2000, category=category)
+            for index in range(count)
+        )
+
+    def test_large_response_is_compressed(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+        self.setup_titles(10)
+        client = APIClient()
+        plain = client.get(reverse('api:titles-list'))
+        response = client.get(
+            reverse('api:titles-list'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие JSON-ответы сжимаются gzip'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] == 'W/' + plain['ETag'], (
+            'Проверьте, что ETag сжатого ответа становится слабым'
+        )
+        revalidated = client.get(
+            reverse('api:titles-list'), HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert revalidated.status_code == 304, (
+            'Проверьте, что слабый ETag сжатого ответа принимается '
+            'в If-None-Match'
+        )
+
+    def test_small_response_is_not_compressed(self):
+        client = APIClient()
+        response = client.get(
+            reverse('api:titles-list'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы короче MIN_SIZE не сжимаются'
+        )
+
+
+class TestCompressedStaticFiles:
+
+    def test_collectstatic_writes_gzip(self, settings, tmp_path, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+        settings.STATIC_ROOT = str(tmp_path)
+        settings.STATICFILES_STORAGE = (
+            'api.compression.CompressedStaticFilesStorage'
+        )
+        call_command('collectstatic', interactive=False, verbosity=0)
+        storage = CompressedStaticFilesStorage(location=str(tmp_path))
+        name = 'admin/css/base.css'
+        with storage.open(name) as original, storage.open(
+            name + '.gz'
+        ) as compressed:
+            assert gzip.decompress(compressed.read()) == original.read(), (
+                'Проверьте, что collectstatic сохраняет .gz рядом с файлом'
+            )
+        assert not storage.exists('admin/img/icon-yes.svg.gz'), (
+            'Проверьте, что маленькие файлы не дублируются'
+        )
@@ -0,0 +1,62 @@
+import pytest
+from api.models import CollectionVersion
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.fixture
+def review():
+    author = User.objects.create(username='author', email='author@yamdb.fake')
+    title = Title.objects.create(name='Произведение', year=2000)
+    return Review.objects.create(
+        title=title, author=author, text='Текст', score=5
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalRequests:
+
+    def test_not_modified_until_collection_changes(self, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+        Review.objects.create(
+            title_id=review.title_id, text='Ещё', score=7,
+            author=User.objects.create(username='other', email='o@yamdb.fake'),
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag меняется после добавления отзыва'
+        )
+
+    def test_if_match_prevents_lost_update(self, review):
+        client = APIClient()
+        client.force_authenticate(review.author)
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        etag = client.get(url)['ETag']
+        assert client.patch(
+            url, {'score': 9}, HTTP_IF_MATCH=etag
+        ).status_code == 200
+        response = client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, (
+            'Проверьте, что If-Match с устаревшим ETag отклоняется'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cascade_delete_bumps_collections_once(review,
+                                               django_assert_num_queries):
+    Comment.objects.bulk_create([
+        Comment(review=review, author=review.author, text=f'Текст {index}')
+        for index in range(50)
+    ])
+    key = f'review:{review.pk}:comments'
+    with django_assert_num_queries(7):
+        review.delete()
+    assert CollectionVersion.objects.get(key=key).version == 2, (
+        'Проверьте, что счётчик коллекции сдвигается один раз'
+    )
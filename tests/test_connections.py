@@ -0,0 +1,43 @@
+import pytest
+from api.db import reset_health_checks
+from api.metrics import collect
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestConnectionHealthChecks:
+
+    def test_dead_connection_is_replaced(self, monkeypatch):
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', True)
+        connection.ensure_connection()
+        monkeypatch.setattr(connection, 'in_atomic_block', False)
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        closed = []
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(True))
+        reset_health_checks()
+        with collect() as metrics:
+            connection.ensure_connection()
+            connection.ensure_connection()
+        assert closed == [True], (
+            'Проверьте, что неработающее соединение закрывается один раз '
+            'за запрос'
+        )
+        assert metrics.connection_wait > 0
+
+    def test_healthy_connection_is_kept(self, monkeypatch):
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', True)
+        connection.ensure_connection()
+        raw = connection.connection
+        reset_health_checks()
+        with collect() as metrics:
+            connection.ensure_connection()
+        assert connection.connection is raw
+        assert metrics.connections_opened == 0
+
+    def test_server_timing_reports_connection_wait(self):
+        response = APIClient().get(reverse('api:titles-list'))
+        assert 'dbconn;dur=' in response['Server-Timing'], (
+            'Проверьте, что ожидание соединения попадает в Server-Timing'
+        )
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from api.mail import deliver_pending
+from api.models import FAILED, PENDING, SENDING, SENT, OutgoingEmail
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+SEEN = []
+
+
+def queue(count=1):
+    for index in range(count):
+        OutgoingEmail.objects.create(
+            subject='Тема', body='Ваш код: ABCD2345',
+            recipient=f'user{index}@yamdb.fake', from_email='test@yamdb.fake',
+        )
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_queues_email(self):
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация возвращает статус 200'
+        )
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newuser@yamdb.fake'
+        assert email.status == PENDING
+
+        assert deliver_pending() == 1
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что send_emails отправляет письма из очереди'
+        )
+        email.refresh_from_db()
+        assert email.status == SENT
+        assert email.body == '', (
+            'Проверьте, что текст с кодом подтверждения стирается '
+            'после отправки'
+        )
+
+    def test_failed_delivery_is_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.BrokenBackend'
+        settings.EMAIL_OUTBOX = dict(settings.EMAIL_OUTBOX, MAX_ATTEMPTS=2)
+        email = OutgoingEmail.objects.create(
+            subject='Тема', body='Текст', recipient='user@yamdb.fake',
+            from_email='test@yamdb.fake',
+        )
+        assert deliver_pending() == 0
+        email.refresh_from_db()
+        assert email.status == PENDING and email.attempts == 1
+        assert deliver_pending() == 0, (
+            'Проверьте, что повторная попытка откладывается'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=email.created)
+        deliver_pending()
+        email.refresh_from_db()
+        assert email.status == FAILED and email.attempts == 2
+        assert email.body == ''
+
+    def test_rows_are_claimed_before_sending(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.InspectingBackend'
+        queue(2)
+        SEEN.clear()
+        savepoints = len(connection.savepoint_ids)
+        assert deliver_pending() == 2
+        assert SEEN == [(savepoints, [SENDING, SENDING])] * 2, (
+            'Проверьте, что письма помечаются отправляемыми в отдельной '
+            'транзакции и отправляются вне её'
+        )
+
+    def test_stale_claims_are_taken_again(self):
+        queue(2)
+        now = timezone.now()
+        OutgoingEmail.objects.filter(recipient='user0@yamdb.fake').update(
+            status=SENDING, next_attempt_at=now - timedelta(seconds=1)
+        )
+        OutgoingEmail.objects.filter(recipient='user1@yamdb.fake').update(
+            status=SENDING, next_attempt_at=now + timedelta(minutes=5)
+        )
+        assert deliver_pending() == 1
+        assert [email.to for email in mail.outbox] == [['user0@yamdb.fake']]
+
+    def test_connection_error_releases_claimed_rows(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.UnreachableBackend'
+        queue(2)
+        with pytest.raises(ConnectionError):
+            deliver_pending()
+        assert set(OutgoingEmail.objects.values_list(
+            'status', flat=True
+        )) == {PENDING}, (
+            'Проверьте, что письма возвращаются в очередь, если почтовый '
+            'сервер недоступен'
+        )
+
+
+class BrokenBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class InspectingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        SEEN.append((len(connection.savepoint_ids), list(
+            OutgoingEmail.objects.order_by('pk').values_list(
+                'status', flat=True
+            )
+        )))
+        return len(email_messages)
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionError('SMTP недоступен')
@@ -0,0 +1,169 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.bulk import SPECS, export_rows
+from reviews.management.commands import import_data
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+ORDER = ('category', 'genre', 'user', 'title', 'review', 'comment')
+
+
+def fill_database():
+    film = Category.objects.create(name='Фильм', slug='film')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    authors = [
+        User.objects.create(
+            username=f'user{index}', email=f'user{index}@yamdb.fake',
+            bio='Строка, с "кавычками"\nи переносом',
+        )
+        for index in range(2)
+    ]
+    for index in range(3):
+        title = Title.objects.create(
+            name=f'Фильм {index}', year=2000, category=film,
+            description='Описание',
+        )
+        title.genre.set([drama, comedy][:index])
+        for author in authors:
+            review = Review.objects.create(
+                title=title, author=author, text='Отзыв', score=index + 5
+            )
+            Comment.objects.create(
+                review=review, author=authors[0], text='Комментарий'
+            )
+
+
+def snapshot():
+    return {name: list(export_rows(SPECS[name], 2)) for name in ORDER}
+
+
+def write_csv(path, rows):
+    path.write_text(
+        'id,text,score,pub_date,title,author\n'
+        + ''.join(f'{row}\n' for row in rows), encoding='utf-8'
+    )
+
+
+@pytest.mark.django_db
+class TestImportExport:
+
+    @pytest.mark.parametrize('data_format', ['csv', 'ndjson'])
+    def test_export_import_round_trip(self, tmp_path, data_format):
+        fill_database()
+        before = snapshot()
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        for name in ORDER:
+            call_command(
+                'export_data', name, format=data_format,
+                output=str(tmp_path / f'{name}.{data_format}'),
+            )
+        for model in (Comment, Review, Title, User, Genre, Category):
+            model.objects.all().delete()
+        for name in ORDER:
+            call_command(
+                'import_data', name, str(tmp_path / f'{name}.{data_format}'),
+                batch_size=2, stdout=io.StringIO(),
+            )
+        assert snapshot() == before, (
+            'Проверьте, что выгрузка загружается обратно без изменений'
+        )
+        assert dict(Title.objects.values_list('pk', 'rating')) == ratings
+
+    def test_resume_from_checkpoint(self, tmp_path, monkeypatch):
+        fill_database()
+        Review.objects.all().delete()
+        titles = list(Title.objects.order_by('pk'))
+        path = tmp_path / 'reviews.csv'
+        write_csv(path, [
+            f'{index + 1},Отзыв,{index + 1},2020-01-0{index + 1}T00:00:00Z,'
+            f'{titles[index // 2].pk},user{index % 2}'
+            for index in range(5)
+        ])
+        save_batch = import_data.Command.save_batch
+        calls = []
+
+        def failing_save_batch(self, *args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise CommandError('Соединение потеряно')
+            return save_batch(self, *args)
+
+        monkeypatch.setattr(
+            import_data.Command, 'save_batch', failing_save_batch
+        )
+        with pytest.raises(CommandError):
+            call_command('import_data', 'review', str(path), batch_size=2)
+        checkpoint = tmp_path / 'reviews.csv.checkpoint'
+        assert json.loads(checkpoint.read_text())['rows'] == 2
+        monkeypatch.setattr(import_data.Command, 'save_batch', save_batch)
+        call_command(
+            'import_data', 'review', str(path), batch_size=2, resume=True,
+            stdout=io.StringIO(),
+        )
+        assert sorted(
+            Review.objects.values_list('pk', flat=True)
+        ) == [1, 2, 3, 4, 5], (
+            'Проверьте, что после --resume загружаются только строки '
+            'после контрольной точки'
+        )
+        assert not checkpoint.exists()
+        assert [
+            title.score_sum for title in Title.objects.order_by('pk')
+        ] == [3, 7, 5]
+
+    def test_rows_without_date_or_required_fields(self, tmp_path):
+        fill_database()
+        Review.objects.all().delete()
+        title = Title.objects.first()
+        path = tmp_path / 'reviews.csv'
+        write_csv(path, [
+            f'1,Без даты,7,,{title.pk},user0',
+            f'2,,7,,{title.pk},user1',
+            '3,Без произведения,7,,,user1',
+        ])
+        errors = io.StringIO()
+        call_command(
+            'import_data', 'review', str(path), stdout=io.StringIO(),
+            stderr=errors,
+        )
+        review = Review.objects.get()
+        assert (review.pk, review.pub_date is not None) == (1, True), (
+            'Проверьте, что отзыв без pub_date получает время загрузки'
+        )
+        assert [line.split(':')[0] for line in errors.getvalue().split(
+            '\n'
+        ) if line] == ['Строка 2', 'Строка 3'], (
+            'Проверьте, что строки без обязательных полей пропускаются '
+            'с сообщением'
+        )
+
+    def test_skip_existing_reports_inserted_rows(self, tmp_path):
+        fill_database()
+        Review.objects.all().delete()
+        title = Title.objects.first()
+        path = tmp_path / 'reviews.csv'
+        write_csv(path, [f'1,Отзыв,7,,{title.pk},user0'])
+        call_command('import_data', 'review', str(path), stdout=io.StringIO())
+        write_csv(path, [
+            f'1,Отзыв,7,,{title.pk},user0', f'2,Отзыв,5,,{title.pk},user1',
+        ])
+        output = io.StringIO()
+        call_command(
+            'import_data', 'review', str(path), skip_existing=True,
+            stdout=output,
+        )
+        assert output.getvalue().strip() == 'Загружено: 1, пропущено: 1', (
+            'Проверьте, что с --skip-existing уже сохранённые строки '
+            'считаются пропущенными'
+        )
+        assert Review.objects.count() == 2
+
+    def test_batch_size_must_be_positive(self, tmp_path):
+        path = tmp_path / 'reviews.csv'
+        write_csv(path, [])
+        with pytest.raises(CommandError):
+            call_command('import_data', 'review', str(path), batch_size=0)
@@ -0,0 +1,86 @@
+import pytest
+from api.metrics import RequestMetrics
+from django.urls import reverse
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def test_server_timing_and_metrics_endpoint(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        Title.objects.create(name='Фильм', year=2000, category=category)
+        client = APIClient()
+        response = client.get(reverse('api:titles-list'))
+        timing = response.get('Server-Timing', '')
+        for metric in ('total;dur=', 'db;dur=', 'view;dur=', 'render;dur='):
+            assert metric in timing, (
+                'Проверьте, что ответ содержит заголовок Server-Timing '
+                f'с метрикой `{metric}`'
+            )
+        text = client.get(reverse('metrics')).content.decode()
+        assert (
+            'api_request_duration_seconds_count'
+            '{endpoint="api:titles-list",method="GET"}'
+        ) in text, (
+            'Проверьте, что /metrics/ отдаёт гистограммы по имени URL'
+        )
+        assert 'api_response_cache_requests_total' in text
+        assert (
+            'api_render_duration_seconds_count'
+            '{endpoint="api:titles-list",method="GET"} 1'
+        ) in text, 'Проверьте, что время рендеринга ответа замеряется'
+
+    def test_metrics_require_allowed_address_or_token(self, settings):
+        settings.METRICS = {'ALLOWED_IPS': ['10.0.0.0/8'], 'TOKEN': 'secret'}
+        client = APIClient()
+        url = reverse('metrics')
+        assert client.get(url, REMOTE_ADDR='10.1.2.3').status_code == 200
+        for headers in (
+            {},
+            {'HTTP_X_FORWARDED_FOR': '10.1.2.3'},
+            {'HTTP_AUTHORIZATION': 'Bearer wrong'},
+        ):
+            assert client.get(
+                url, REMOTE_ADDR='203.0.113.5', **headers
+            ).status_code == 403, (
+                'Проверьте, что /metrics/ закрыт для посторонних адресов'
+            )
+        assert client.get(
+            url, REMOTE_ADDR='203.0.113.5',
+            HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code == 200
+        settings.METRICS = {'ALLOWED_IPS': [], 'TOKEN': ''}
+        assert client.get(
+            url, HTTP_AUTHORIZATION='Bearer '
+        ).status_code == 403, 'Проверьте, что пустой токен не принимается'
+
+    def test_serializers_are_not_patched(self):
+        assert BaseSerializer.data.fget.__module__ == (
+            'rest_framework.serializers'
+        ), 'Проверьте, что BaseSerializer.data не подменяется'
+
+    def test_duplicate_queries_are_flagged(self, caplog):
+        metrics = RequestMetrics()
+        for _ in range(3):
+            metrics(
+                lambda *args: None,
+                'SELECT * FROM reviews_genre WHERE id = %s', (1,),
+                False, {}
+            )
+        metrics(lambda *args: None, 'SELECT 1', (), False, {})
+        assert metrics.queries == 4
+        assert metrics.duplicates(3) == {
+            'SELECT * FROM reviews_genre WHERE id = %s': 3
+        }, 'Проверьте, что повторяющийся SQL-запрос отмечается как N+1'
+
+    def test_duplicate_queries_header(self, settings):
+        for index in range(3):
+            Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        client = APIClient()
+        response = client.get(reverse('api:genres-list'))
+        assert 'duplicates' not in response['Server-Timing'], (
+            'Проверьте, что список жанров не выполняет повторяющихся запросов'
+        )
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from api.leaderboards import refresh_leaderboards
+from api.models import TitleRanking
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLeaderboards:
+
+    def setup_titles(self, scores):
+        """
+        Создаёт по произведению на каждый список оценок; первое
+        произведение в категории film и жанре drama.
+        """
+        film = Category.objects.create(name='Фильм', slug='film')
+        book = Category.objects.create(name='Книга', slug='book')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        users = [
+            User.objects.create(
+                username=f'user{index}', email=f'user{index}@yamdb.fake'
+            )
+            for index in range(max(len(title) for title in scores))
+        ]
+        titles = []
+        for index, title_scores in enumerate(scores):
+            title = Title.objects.create(
+                name=f'Произведение {index}', year=2000,
+                category=film if index == 0 else book
+            )
+            for author, score in zip(users, title_scores):
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=score
+                )
+            titles.append(title)
+        titles[0].genre.set([drama])
+        return titles
+
+    def get_board(self, board, **params):
+        url = reverse('api:leaderboards-list', kwargs={'board': board})
+        return APIClient().get(url, params).json()['results']
+
+    def test_bayesian_score_dampens_few_reviews(self):
+        single, many, _ = self.setup_titles([[10], [9] * 12, [3] * 12])
+        refresh_leaderboards()
+        results = self.get_board('top')
+        assert [item['title']['id'] for item in results[:2]] == [
+            many.pk, single.pk
+        ], (
+            'Проверьте, что произведение с одним высоким отзывом не '
+            'обгоняет произведение со множеством отзывов'
+        )
+        assert results[0]['position'] == 1
+        assert results[0]['review_count'] == 12
+
+    def test_scopes_and_incremental_refresh(self):
+        drama_title, other = self.setup_titles([[6, 6], [8, 8]])
+        refresh_leaderboards()
+        assert [item['title']['id'] for item in self.get_board(
+            'top', genre='drama'
+        )] == [drama_title.pk]
+        assert [item['title']['id'] for item in self.get_board(
+            'top', category='book'
+        )] == [other.pk]
+        other.genre.set(Genre.objects.all())
+        assert refresh_leaderboards()['top'] > 0
+        assert [item['title']['id'] for item in self.get_board(
+            'top', genre='drama'
+        )] == [other.pk, drama_title.pk], (
+            'Проверьте, что смена жанров учитывается при обновлении рейтинга'
+        )
+        assert refresh_leaderboards()['top'] == 0, (
+            'Проверьте, что без изменений рейтинг лучших не пересчитывается'
+        )
+
+    def test_trending_counts_only_recent_reviews(self):
+        old, recent = self.setup_titles([[10, 10], [7]])
+        Review.objects.filter(title=old).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        refresh_leaderboards()
+        assert [item['title']['id'] for item in self.get_board(
+            'trending'
+        )] == [recent.pk]
+
+    def test_reads_rankings_by_index(self):
+        self.setup_titles([[5], [7]])
+        refresh_leaderboards()
+        with CaptureQueriesContext(connection) as context:
+            results = self.get_board('top', limit=1)
+        assert len(results) == 1
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что рейтинг не читает таблицу отзывов'
+        assert TitleRanking.objects.filter(board='top').exists()
+
+    def test_unknown_scope_returns_404(self):
+        url = reverse('api:leaderboards-list', kwargs={'board': 'top'})
+        assert APIClient().get(url, {'genre': 'none'}).status_code == 404
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    def test_titles_can_be_ordered_by_rating(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        for index, score in enumerate((4, 9, 6)):
+            title = Title.objects.create(
+                name=f'Произведение {index}', year=2000, category=category
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        response = APIClient().get(
+            reverse('api:titles-list'), {'ordering': '-rating'}
+        )
+        assert [item['rating'] for item in response.json()['results']] == [
+            9, 6, 4
+        ], 'Проверьте, что список произведений сортируется по рейтингу'
@@ -0,0 +1,115 @@
+import base64
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Review, Title, User
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Фильм', year=2000)
+
+
+def add_reviews(title, count, pub_date=None):
+    start = User.objects.count()
+    reviews = []
+    for index in range(start, start + count):
+        author = User.objects.create(
+            username=f'user{index}', email=f'user{index}@yamdb.fake'
+        )
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='Текст', score=5
+        ))
+    if pub_date is not None:
+        Review.objects.filter(
+            pk__in=[review.pk for review in reviews]
+        ).update(pub_date=pub_date)
+    return reviews
+
+
+def walk(client, url, between=None):
+    ids = []
+    url = f'{url}?cursor='
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['previous'] is None
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+        if between is not None and url:
+            between()
+            between = None
+    return ids
+
+
+def cursor(position):
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walks_all_pages_with_equal_dates(self, title):
+        now = timezone.now()
+        for hours in (1, 2, 3):
+            add_reviews(title, 9, now - timedelta(hours=hours))
+        expected = list(Review.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        assert walk(APIClient(), url) == expected, (
+            'Проверьте, что при равных pub_date отзывы упорядочены по id '
+            'и не теряются и не повторяются на границах страниц'
+        )
+
+    def test_rows_inserted_between_pages(self, title):
+        now = timezone.now()
+        add_reviews(title, 25, now - timedelta(hours=1))
+        expected = list(Review.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        inserted = {}
+
+        def insert():
+            inserted['new'] = add_reviews(title, 1)[0].pk
+            inserted['old'] = add_reviews(
+                title, 1, now - timedelta(hours=2)
+            )[0].pk
+
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        assert walk(APIClient(), url, between=insert) == (
+            expected + [inserted['old']]
+        ), (
+            'Проверьте, что новые отзывы не сдвигают следующие страницы, '
+            'а более старые попадают в свою позицию'
+        )
+
+    @pytest.mark.parametrize('value', [
+        'not-base64!',
+        cursor('garbage'),
+        cursor('2020-01-01T00:00:00+00:00|abc'),
+        cursor('2020-13-45T00:00:00+00:00|1'),
+        cursor('2020-01-01T00:00:00|1'),
+        cursor('0001-01-01T00:00:00+05:00|1'),
+        cursor(f'2020-01-01T00:00:00+00:00|{10 ** 30}'),
+        cursor('2020-01-01T00:00:00+00:00|-1'),
+        base64.urlsafe_b64encode(b'\xff\xfe|1').decode(),
+    ])
+    def test_tampered_cursor_returns_404(self, title, value):
+        add_reviews(title, 1)
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        assert APIClient().get(url, {'cursor': value}).status_code == 404
+
+    def test_page_number_fallback(self, title):
+        add_reviews(title, 12)
+        client = APIClient()
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        data = client.get(url).json()
+        assert list(data) == ['count', 'next', 'previous', 'results']
+        assert data['count'] == 12 and len(data['results']) == 10
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 2 and data['next'] is None
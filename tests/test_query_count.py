@@ -0,0 +1,79 @@
+import pytest
+from api.cache import response_cache
+from api.leaderboards import refresh_leaderboards
+from api.urls import router_v1
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import ADMIN, Category, Comment, Genre, Review, Title, User
+
+LIST_URL_KWARGS = {
+    'reviews': {'title_id': 1},
+    'comments': {'title_id': 1, 'review_id': 1},
+    'leaderboards': {'board': 'top'},
+}
+
+
+def fill_database(size):
+    """
+    Доводит число объектов каждой модели до size. Все отзывы относятся
+    к произведению с id=1, все комментарии — к отзыву с id=1.
+    """
+    for index in range(Title.objects.count(), size):
+        category = Category.objects.create(
+            name=f'Категория {index}', slug=f'category-{index}'
+        )
+        Genre.objects.create(
+            name=f'Жанр {index}', slug=f'genre-{index}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {index}', year=2000, category=category
+        )
+        title.genre.set(Genre.objects.all())
+        author = User.objects.create(
+            username=f'user{index}', email=f'user{index}@yamdb.fake'
+        )
+        Review.objects.create(
+            title_id=1, author=author, text='Текст', score=5
+        )
+        Comment.objects.create(review_id=1, author=author, text='Текст')
+    refresh_leaderboards(full=True)
+
+
+def count_queries(client, url):
+    # Поколения кэша сдвигаются только после фиксации, а тест идёт
+    # внутри транзакции: без сброса ответ взялся бы из кэша.
+    response_cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    def test_list_endpoints_have_no_n_plus_one(self):
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=ADMIN
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        urls = [
+            reverse(f'api:{basename}-list',
+                    kwargs=LIST_URL_KWARGS.get(basename, {}))
+            for _, _, basename in router_v1.registry
+        ]
+        fill_database(2)
+        small = {url: count_queries(client, url) for url in urls}
+        fill_database(8)
+        for url in urls:
+            queries = count_queries(client, url)
+            assert queries == small[url], (
+                f'Число запросов к БД для `{url}` растёт вместе с числом '
+                f'объектов на странице: {small[url]} -> {queries}. '
+                'Проверьте select_related/prefetch_related во вьюсете'
+            )
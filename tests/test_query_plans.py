@@ -0,0 +1,34 @@
+import pytest
+from api.management.commands.check_query_plans import sequential_scans
+from django.core.management import call_command
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_canonical_queries_use_indexes(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        for index in range(3):
+            title = Title.objects.create(
+                name=f'Фильм {index}', year=2000 + index, category=category
+            )
+            title.genre.set([genre])
+            review = Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='Текст')
+        call_command('check_query_plans', threshold=0)
+
+    def test_sequential_scan_detection(self):
+        plan = (
+            '2 0 0 SCAN TABLE reviews_user\n'
+            '5 0 0 SCAN reviews_title USING INDEX title_year_category_id_idx\n'
+            '9 0 0 SEARCH reviews_category USING INTEGER PRIMARY KEY (rowid=?)'
+        )
+        assert sequential_scans(plan) == {'reviews_user'}, (
+            'Проверьте, что чтение по индексу не считается '
+            'последовательным сканированием'
+        )
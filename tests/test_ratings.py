@@ -0,0 +1,115 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title, TitleStats, User
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=f'Фильм {index}', year=2000)
+        for index in range(2)
+    ]
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create(
+            username=f'user{index}', email=f'user{index}@yamdb.fake'
+        )
+        for index in range(2)
+    ]
+
+
+def rating(title):
+    title.refresh_from_db()
+    return title.review_count, title.score_sum, title.rating
+
+
+def score_counts(title):
+    stats = TitleStats.objects.filter(title=title).first()
+    return stats and {
+        score: getattr(stats, f'score_{score}')
+        for score in range(1, 11) if getattr(stats, f'score_{score}')
+    }
+
+
+@pytest.mark.django_db
+class TestRatingSignals:
+
+    def test_create_update_and_delete_last_review(self, titles, authors):
+        title = titles[0]
+        assert rating(title) == (0, 0, None)
+        first = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=4
+        )
+        second = Review.objects.create(
+            title=title, author=authors[1], text='Отзыв', score=9
+        )
+        assert rating(title) == (2, 13, 6.5)
+        second.score = 7
+        second.save()
+        assert rating(title) == (2, 11, 5.5), (
+            'Проверьте, что изменение оценки сдвигает рейтинг'
+        )
+        assert score_counts(title) == {4: 1, 7: 1}
+        first.delete()
+        second.delete()
+        assert rating(title) == (0, 0, None), (
+            'Проверьте, что после удаления последнего отзыва рейтинг '
+            'снова пуст'
+        )
+        assert score_counts(title) == {}
+
+    def test_review_moved_between_titles(self, titles, authors):
+        review = Review.objects.create(
+            title=titles[0], author=authors[0], text='Отзыв', score=8
+        )
+        Review.objects.create(
+            title=titles[1], author=authors[1], text='Отзыв', score=2
+        )
+        review.title = titles[1]
+        review.save()
+        assert rating(titles[0]) == (0, 0, None)
+        assert rating(titles[1]) == (2, 10, 5.0), (
+            'Проверьте, что перенос отзыва учитывается в обоих '
+            'произведениях'
+        )
+        assert score_counts(titles[1]) == {2: 1, 8: 1}
+
+    def test_cascade_delete_of_title_and_user(self, titles, authors):
+        for title in titles:
+            for score, author in enumerate(authors, 3):
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=score
+                )
+        authors[0].delete()
+        assert rating(titles[0]) == rating(titles[1]) == (1, 4, 4.0), (
+            'Проверьте, что каскадное удаление отзывов автора '
+            'пересчитывает рейтинги'
+        )
+        titles[0].delete()
+        assert not TitleStats.objects.filter(title_id=titles[0].pk).exists()
+        assert rating(titles[1]) == (1, 4, 4.0)
+
+    def test_recount_ratings_repairs_drift(self, titles, authors):
+        for author, score in zip(authors, (6, 10)):
+            Review.objects.create(
+                title=titles[0], author=author, text='Отзыв', score=score
+            )
+        Title.objects.filter(pk=titles[0].pk).update(
+            review_count=5, score_sum=1, rating=0.2
+        )
+        Title.objects.filter(pk=titles[1].pk).update(rating=3)
+        output = io.StringIO()
+        call_command('recount_ratings', dry_run=True, stdout=output)
+        assert 'расхождениями: 1' in output.getvalue()
+        assert rating(titles[0]) == (5, 1, 0.2)
+        call_command('recount_ratings', stdout=io.StringIO())
+        assert rating(titles[0]) == (2, 16, 8.0)
+        call_command('recount_ratings', all=True, stdout=io.StringIO())
+        assert rating(titles[1]) == (0, 0, None), (
+            'Проверьте, что --all пересчитывает все произведения'
+        )
@@ -0,0 +1,42 @@
+import io
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from api.renderers import FastJSONParser, FastJSONRenderer
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import User
+
+
+class TestFastJSON:
+
+    def test_output_matches_default_renderer(self):
+        data = {
+            'id': 1, 'name': 'Фильм', 'rating': None,
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'score': Decimal('7.5'), 'uuid': uuid.UUID(int=1),
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'Проверьте, что FastJSONRenderer выдаёт тот же JSON, что DRF'
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        stream = json.dumps({'text': 'Отзыв'}, ensure_ascii=False).encode()
+        assert parser.parse(io.BytesIO(stream)) == {'text': 'Отзыв'}
+
+
+@pytest.mark.django_db
+def test_malformed_json_is_rejected():
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='user', email='u@yamdb.fake')
+    )
+    response = client.post(
+        reverse('api:reviews-bulk'), '[{"title": ',
+        content_type='application/json'
+    )
+    assert response.status_code == 400
@@ -0,0 +1,125 @@
+import pytest
+from api import replicas
+from api.replicas import PRIMARY, ReplicaSelector
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Title, User
+
+REPLICATION = {
+    'REPLICAS': ['replica'],
+    'STRATEGY': 'round_robin',
+    'STICKY_SECONDS': 60,
+    'MAX_LAG_SECONDS': 30,
+    'LAG_CHECK_INTERVAL': 0,
+    'CACHE_ALIAS': 'default',
+}
+
+
+@pytest.fixture
+def replication(settings):
+    settings.DATABASE_REPLICATION = dict(REPLICATION)
+    replicas.selector.reset()
+    replicas.pin_cache().clear()
+    return settings.DATABASE_REPLICATION
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_safe_requests_read_from_replica(self, replication):
+        Category.objects.create(name='Основная', slug='primary')
+        Category.objects.using('replica').create(name='Реплика', slug='copy')
+        response = APIClient().get(reverse('api:categories-list'))
+        assert [item['slug'] for item in response.json()['results']] == [
+            'copy'
+        ], 'Проверьте, что GET-запросы к API читают из реплики'
+        assert replicas.get_read_alias() is None, (
+            'Проверьте, что выбор реплики сбрасывается после запроса'
+        )
+
+    def test_writer_reads_own_writes(self, replication):
+        for using in (PRIMARY, 'replica'):
+            category = Category.objects.using(using).create(
+                name='Фильм', slug='film'
+            )
+            Title.objects.using(using).create(
+                pk=1, name='Фильм', year=2000, category=category
+            )
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(author)
+        url = reverse('api:reviews-list', kwargs={'title_id': 1})
+        response = client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи чтения автора идут в основную базу'
+        )
+        assert APIClient().get(url).json()['count'] == 0, (
+            'Проверьте, что остальные пользователи читают из реплики'
+        )
+
+    def test_profile_update_pins_reads_to_primary(self, replication):
+        for using in (PRIMARY, 'replica'):
+            Category.objects.using(using).create(name='Фильм', slug=using)
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.patch(reverse('api:me'), {'bio': 'О себе'})
+        assert response.status_code == 200
+        response = client.get(reverse('api:categories-list'))
+        assert [item['slug'] for item in response.json()['results']] == [
+            PRIMARY
+        ], 'Проверьте, что PATCH /users/me/ закрепляет чтения за основной '
+        'базой'
+
+    def test_pinned_writer_bypasses_response_cache(self, replication):
+        Category.objects.create(name='Основная', slug='primary')
+        Category.objects.using('replica').create(name='Реплика', slug='copy')
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('api:categories-list')
+        assert client.get(url)['X-Cache'] == 'MISS'
+        replicas.pin_to_primary(user)
+        response = client.get(url)
+        assert response['X-Cache'] == 'BYPASS'
+        assert [item['slug'] for item in response.json()['results']] == [
+            'primary'
+        ], (
+            'Проверьте, что закреплённый за основной базой пользователь не '
+            'получает ответ из кэша, заполненного из реплики'
+        )
+
+    def test_replicas_require_shared_cache(self, replication, settings):
+        from api.checks import check_replica_pin_cache
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in check_replica_pin_cache(None)] == [
+            'api.E002'
+        ], 'Проверьте, что кэш одного процесса не допускается'
+        replication['REPLICAS'] = []
+        assert check_replica_pin_cache(None) == []
+
+
+class TestReplicaSelector:
+
+    def test_round_robin(self, replication, monkeypatch):
+        replication['REPLICAS'] = ['a', 'b']
+        monkeypatch.setattr(replicas, 'measure_lag', lambda alias: 0.0)
+        selector = ReplicaSelector()
+        assert [selector.choose() for _ in range(4)] == ['a', 'b', 'a', 'b']
+
+    def test_least_lag_skips_lagging_and_unavailable(
+        self, replication, monkeypatch
+    ):
+        replication.update(REPLICAS=['a', 'b', 'c'], STRATEGY='least_lag')
+        lags = {'a': 5.0, 'b': 1.0, 'c': None}
+        monkeypatch.setattr(replicas, 'measure_lag', lags.get)
+        assert ReplicaSelector().choose() == 'b'
+        lags.update(a=100.0, b=50.0)
+        assert ReplicaSelector().choose() == PRIMARY, (
+            'Проверьте, что при отставании всех реплик чтение идёт '
+            'в основную базу'
+        )
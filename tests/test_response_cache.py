@@ -0,0 +1,142 @@
+import pytest
+from api.cache import LRUCacheBackend, response_cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='film')
+    return Title.objects.create(name='Фильм', year=2000, category=category)
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response['X-Cache'], response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_repeated_get_is_served_from_cache(self, title):
+        client = APIClient()
+        for url in (
+            reverse('api:titles-list'),
+            reverse('api:titles-detail', kwargs={'pk': title.pk}),
+            reverse('api:genres-list'),
+            reverse('api:categories-list'),
+        ):
+            miss, data = get(client, url)
+            hit, cached = get(client, url)
+            assert (miss, hit) == ('MISS', 'HIT'), (
+                f'Проверьте, что повторный GET `{url}` берётся из кэша'
+            )
+            assert cached == data
+
+    @pytest.mark.parametrize('url_name, write', [
+        ('api:titles-list', lambda title: Title.objects.create(
+            name='Новое', year=2001, category=title.category
+        )),
+        ('api:titles-list', lambda title: title.genre.add(
+            Genre.objects.create(name='Драма', slug='drama')
+        )),
+        ('api:titles-list', lambda title: Category.objects.filter(
+            pk=title.category_id
+        ).first().delete()),
+        ('api:genres-list', lambda title: Genre.objects.create(
+            name='Драма', slug='drama'
+        )),
+        ('api:categories-list', lambda title: Category.objects.create(
+            name='Книга', slug='book'
+        )),
+    ])
+    def test_write_invalidates_cached_responses(self, title, url_name,
+                                                write):
+        client = APIClient()
+        url = reverse(url_name)
+        _, before = get(client, url)
+        write(title)
+        status, after = get(client, url)
+        assert status == 'MISS', (
+            f'Проверьте, что запись сбрасывает кэш `{url}`'
+        )
+        assert after != before
+
+    def test_review_write_refreshes_title_rating(self, title):
+        client = APIClient()
+        url = reverse('api:titles-detail', kwargs={'pk': title.pk})
+        assert get(client, url)[1]['rating'] is None
+        Review.objects.create(
+            title=title, text='Отзыв', score=8,
+            author=User.objects.create(username='author', email='a@ya.fake')
+        )
+        status, data = get(client, url)
+        assert (status, data['rating']) == ('MISS', 8), (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+        )
+
+    def test_generation_moves_after_commit(self, title):
+        client = APIClient()
+        url = reverse('api:genres-list')
+        get(client, url)
+        before = response_cache.get_generations(['reviews.genre'])[0]
+        with transaction.atomic():
+            Genre.objects.create(name='Драма', slug='drama')
+            Genre.objects.create(name='Комедия', slug='comedy')
+            assert get(client, url)[0] == 'HIT', (
+                'Проверьте, что поколение кэша сдвигается только после '
+                'фиксации транзакции'
+            )
+        assert response_cache.get_generations(['reviews.genre']) == [
+            before + 1
+        ], 'Проверьте, что поколение сдвигается один раз на транзакцию'
+        status, data = get(client, url)
+        assert (status, data['count']) == ('MISS', 2)
+
+    def test_roles_do_not_share_entries(self, title):
+        url = reverse('api:titles-list')
+        admin = User.objects.create(
+            username='admin', email='admin@ya.fake', role='admin'
+        )
+        anonymous = APIClient()
+        staff = APIClient()
+        staff.force_authenticate(admin)
+        assert get(anonymous, url)[0] == 'MISS'
+        assert get(staff, url)[0] == 'MISS', (
+            'Проверьте, что ответ анонимному пользователю не отдаётся '
+            'администратору'
+        )
+        reader = APIClient()
+        reader.force_authenticate(
+            User.objects.create(username='reader', email='r@ya.fake')
+        )
+        assert get(reader, url)[0] == 'MISS'
+        assert get(staff, url)[0] == 'HIT'
+
+    def test_cache_stores_plain_data(self, title):
+        get(APIClient(), reverse('api:titles-list'))
+        values = [value for _, value in response_cache._entries.values()]
+        assert [type(value) for value in values] == [dict]
+        assert type(values[0]['results']) is list
+        assert type(values[0]['results'][0]) is dict, (
+            'Проверьте, что в кэше не хранятся ReturnDict и ReturnList '
+            'со ссылками на сериализатор'
+        )
+
+
+def test_lru_backend_evicts_and_expires(monkeypatch):
+    clock = {'now': 0.0}
+    monkeypatch.setattr('time.monotonic', lambda: clock['now'])
+    backend = LRUCacheBackend(timeout=10, max_entries=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    assert backend.get('a') == 1
+    backend.set('c', 3)
+    assert (backend.get('a'), backend.get('b')) == (1, None), (
+        'Проверьте, что вытесняется давно не использованная запись'
+    )
+    clock['now'] = 11
+    assert backend.get('c') is None
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pytest
+from api.batch import REVIEW_ALREADY_EXISTS
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username='author', email='a@yamdb.fake')
+
+
+@pytest.fixture
+def client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.mark.django_db
+class TestReviews:
+
+    def test_duplicate_review_returns_400(self, client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        response = client.post(url, {'text': 'Отзыв', 'score': 8})
+        assert response.status_code == 201
+        response = client.post(url, {'text': 'Ещё отзыв', 'score': 2})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': [REVIEW_ALREADY_EXISTS]
+        }, 'Проверьте ответ на повторный отзыв того же автора'
+        title.refresh_from_db()
+        assert (title.review_count, title.rating) == (1, 8.0)
+
+    def test_other_integrity_errors_are_not_masked(self, client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        error = IntegrityError('NOT NULL constraint failed')
+        with patch.object(Review, 'save', side_effect=error):
+            with pytest.raises(IntegrityError):
+                client.post(url, {'text': 'Отзыв', 'score': 8})
+
+    def test_comments_of_review_from_other_title_return_404(
+        self, client, author
+    ):
+        titles = [
+            Title.objects.create(name=f'Фильм {index}', year=2000)
+            for index in range(2)
+        ]
+        review = Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=5
+        )
+        comment = Comment.objects.create(
+            review=review, author=author, text='Комментарий'
+        )
+        kwargs = {'title_id': titles[1].pk, 'review_id': review.pk}
+        list_url = reverse('api:comments-list', kwargs=kwargs)
+        detail_url = reverse(
+            'api:comments-detail', kwargs={**kwargs, 'pk': comment.pk}
+        )
+        assert client.get(list_url).status_code == 404, (
+            'Проверьте, что отзыв ищется только среди отзывов '
+            'произведения из адреса'
+        )
+        assert client.get(detail_url).status_code == 404
+        assert client.post(list_url, {'text': 'Ещё'}).status_code == 404
+        assert Comment.objects.count() == 1
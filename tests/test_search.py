@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    film = Category.objects.create(name='Фильм', slug='film')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    rows = {
+        'name': ('Звёздные войны', 'Фантастика о войне', film, drama),
+        'description': ('Дюна', 'Звёздные войны на песчаной планете',
+                        book, drama),
+        'other': ('Солярис', 'Океан на далёкой планете', film, comedy),
+    }
+    result = {}
+    for key, (name, description, category, genre) in rows.items():
+        title = Title.objects.create(
+            name=name, description=description, year=2000,
+            category=category
+        )
+        title.genre.add(genre)
+        result[key] = title.pk
+    return result
+
+
+def names(response):
+    assert response.status_code == 200
+    return [item['name'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_ranks_name_above_description(self, titles):
+        client = APIClient()
+        expected = ['Звёздные войны', 'Дюна']
+        assert names(client.get(
+            reverse('api:titles-search'), {'q': 'звёздные войны'}
+        )) == expected, (
+            'Проверьте, что совпадение в названии выше совпадения '
+            'в описании'
+        )
+        assert names(client.get(
+            reverse('api:titles-list'), {'search': 'звёздные войны'}
+        )) == expected
+
+    def test_search_matches_word_prefixes(self, titles):
+        assert sorted(names(APIClient().get(
+            reverse('api:titles-search'), {'q': 'план'}
+        ))) == ['Дюна', 'Солярис'], (
+            'Проверьте, что слова запроса ищутся как префиксы'
+        )
+
+    def test_empty_query_returns_nothing(self, titles):
+        for query in ('', '   ', '"*'):
+            assert names(APIClient().get(
+                reverse('api:titles-search'), {'q': query}
+            )) == [], f'Проверьте поиск по запросу `{query}`'
+
+    def test_search_is_filtered(self, titles):
+        assert names(APIClient().get(
+            reverse('api:titles-search'), {'q': 'планете', 'genre': 'dram'}
+        )) == ['Дюна']
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def test_slug_filters_match_substrings_or_exactly(self, titles):
+        client = APIClient()
+        url = reverse('api:titles-list')
+        assert sorted(names(client.get(url, {'category': 'fil'}))) == [
+            'Звёздные войны', 'Солярис'
+        ], 'Проверьте, что фильтр category ищет вхождение в slug'
+        assert names(client.get(url, {'category_exact': 'fil'})) == []
+        assert sorted(names(client.get(url, {'genre_exact': 'drama'}))) == [
+            'Дюна', 'Звёздные войны'
+        ]
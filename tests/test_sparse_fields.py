@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def setup_title(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Фильм', year=2000, category=category,
+            description='Длинное описание',
+        )
+        title.genre.set([genre])
+        return title
+
+    def test_title_fields_limit_response_and_query(self):
+        self.setup_title()
+        client = APIClient()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                reverse('api:titles-list'), {'fields': 'id,name'}
+            )
+        assert response.status_code == 200
+        assert list(response.json()['results'][0]) == ['id', 'name'], (
+            'Проверьте, что ?fields= оставляет только перечисленные поля'
+        )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что ненужные колонки и prefetch не загружаются'
+        )
+
+    def test_title_expand(self):
+        self.setup_title()
+        client = APIClient()
+        result = client.get(
+            reverse('api:titles-list'),
+            {'fields': 'genre,category', 'expand': 'category'}
+        ).json()['results'][0]
+        assert result == {
+            'genre': ['drama'],
+            'category': {'name': 'Фильм', 'slug': 'film'},
+        }, 'Проверьте, что без expand связанные объекты выводятся slug'
+        legacy = client.get(reverse('api:titles-list')).json()['results'][0]
+        assert legacy['genre'] == [{'name': 'Драма', 'slug': 'drama'}], (
+            'Проверьте, что без параметров ответ не меняется'
+        )
+
+    def test_review_fields(self):
+        title = self.setup_title()
+        for index in range(3):
+            author = User.objects.create(
+                username=f'user{index}', email=f'user{index}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        client = APIClient()
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'fields': 'id,score'})
+        assert [list(item) for item in response.json()['results']] == [
+            ['id', 'score']
+        ] * 3
+        assert len(context.captured_queries) <= 4, (
+            'Проверьте, что сокращённый ответ не загружает отзывы по одному'
+        )
+
+    def test_unknown_fields(self):
+        client = APIClient()
+        response = client.get(reverse('api:titles-list'), {'fields': 'nope'})
+        assert response.status_code == 400
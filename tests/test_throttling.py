@@ -0,0 +1,99 @@
+import pytest
+from api.throttling import CacheBucketStore, LocalBucketStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import Category, Title, User
+
+RATES = {
+    'auth_ip': '3/min',
+    'auth_username': '2/min',
+    'review_write': '2/min',
+    'comment_write': '2/min',
+}
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    from rest_framework.throttling import SimpleRateThrottle
+
+    monkeypatch.setattr(SimpleRateThrottle, 'THROTTLE_RATES', RATES)
+
+
+def signup(client, username, address='10.0.0.1'):
+    return client.post(
+        reverse('api:signup'),
+        {'username': username, 'email': f'{username}@yamdb.fake'},
+        HTTP_X_FORWARDED_FOR=address,
+    )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_auth_is_limited_per_ip_and_username(self, rates):
+        client = APIClient()
+        assert signup(client, 'first').status_code == 200
+        assert signup(client, 'first').status_code == 200
+        response = signup(client, 'first', address='10.0.0.2')
+        assert response.status_code == 429, (
+            'Проверьте, что запросы с одним username ограничиваются '
+            'независимо от IP-адреса'
+        )
+        assert int(response['Retry-After']) > 0
+        assert signup(client, 'second').status_code == 200
+        assert signup(client, 'third').status_code == 429, (
+            'Проверьте, что запросы с одного IP-адреса ограничиваются'
+        )
+        assert signup(client, 'third', address='10.0.0.3').status_code == 200
+
+    def test_rejected_token_requests_do_not_query_database(self, rates):
+        client = APIClient()
+        url = reverse('api:token')
+        data = {'username': 'victim', 'confirmation_code': 'WRONG'}
+        for _ in range(2):
+            client.post(url, data)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data)
+        assert response.status_code == 429
+        assert not context.captured_queries, (
+            'Проверьте, что ограничение частоты не обращается к базе'
+        )
+
+    def test_review_writes_are_limited_per_user(self, rates):
+        category = Category.objects.create(name='Фильм', slug='film')
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create(username='author', email='a@yamdb.fake')
+        )
+        statuses = []
+        for index in range(3):
+            title = Title.objects.create(
+                name=f'Фильм {index}', year=2000, category=category
+            )
+            statuses.append(client.post(
+                reverse('api:reviews-list', kwargs={'title_id': title.pk}),
+                {'text': 'Отзыв', 'score': 5}
+            ).status_code)
+        assert statuses == [201, 201, 429]
+        assert client.get(
+            reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        ).status_code == 200, 'Проверьте, что чтения не ограничиваются'
+
+
+@pytest.mark.parametrize('store_class', [LocalBucketStore, CacheBucketStore])
+def test_bucket_refills_over_time(store_class, monkeypatch):
+    clock = {'now': 1000.0}
+    monkeypatch.setattr('time.monotonic', lambda: clock['now'])
+    monkeypatch.setattr('time.time', lambda: clock['now'])
+    store = store_class()
+    store.clear()
+    assert [store.consume('key', 1.0, 2) for _ in range(3)] == [0, 0, 1.0]
+    clock['now'] += 1.0
+    assert store.consume('key', 1.0, 2) == 0
+    assert store.consume('key', 1.0, 2) == 1.0
+    clock['now'] += 10.0
+    assert [store.consume('key', 1.0, 2) for _ in range(3)] == [0, 0, 1.0], (
+        'Проверьте, что корзина не накапливает больше capacity токенов'
+    )
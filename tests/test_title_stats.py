@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Review, Title, TitleStats, User
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def setup_reviews(self, scores):
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000, category=category)
+        reviews = [
+            Review.objects.create(
+                title=title, text='Отзыв', score=score,
+                author=User.objects.create(
+                    username=f'user{index}', email=f'user{index}@yamdb.fake'
+                ),
+            )
+            for index, score in enumerate(scores)
+        ]
+        return title, reviews
+
+    def get_stats(self, title):
+        url = reverse('api:titles-stats', kwargs={'pk': title.pk})
+        return APIClient().get(url).json()
+
+    def test_stats_follow_review_writes(self):
+        title, reviews = self.setup_reviews([2, 8, 8, 10])
+        stats = self.get_stats(title)
+        assert stats['count'] == 4
+        assert stats['mean'] == 7.0
+        assert stats['median'] == 8.0
+        assert stats['recent_average'] == 7.0
+        assert stats['histogram']['8'] == 2
+        reviews[0].score = 6
+        reviews[0].save()
+        reviews[3].delete()
+        stats = self.get_stats(title)
+        assert stats['histogram']['2'] == 0 and stats['histogram']['6'] == 1
+        assert stats['histogram']['10'] == 0, (
+            'Проверьте, что статистика обновляется при изменении '
+            'и удалении отзывов'
+        )
+        assert stats['median'] == 8.0 and stats['count'] == 3
+
+    def test_stats_do_not_read_reviews(self):
+        title, _ = self.setup_reviews([5, 7])
+        url = reverse('api:titles-stats', kwargs={'pk': title.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(url)
+        assert response.status_code == 200
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что статистика не читает таблицу отзывов'
+
+    def test_recent_average_prefers_new_reviews(self):
+        title, reviews = self.setup_reviews([10, 2])
+        Review.objects.filter(pk=reviews[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        Title.objects.filter(pk=title.pk).refresh_rating()
+        stats = self.get_stats(title)
+        assert stats['mean'] == 6.0
+        assert stats['recent_average'] < 2.1, (
+            'Проверьте, что в недавнем среднем старые отзывы весят меньше'
+        )
+
+    def test_title_without_reviews_and_missing_title(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000, category=category)
+        assert self.get_stats(title)['count'] == 0
+        response = APIClient().get(
+            reverse('api:titles-stats', kwargs={'pk': title.pk + 1})
+        )
+        assert response.status_code == 404
+
+    def test_title_delete_removes_stats(self):
+        title, _ = self.setup_reviews([5])
+        title.delete()
+        assert not TitleStats.objects.exists()
+
+    def test_non_numeric_title_id_returns_404(self):
+        response = APIClient().get('/api/v1/titles/abc/stats/')
+        assert response.status_code == 404, (
+            'Проверьте, что нечисловой id произведения даёт 404, а не 500'
+        )
+
+    def test_weights_stay_bounded_with_short_half_life(self, settings):
+        settings.REVIEW_STATS = {'RECENT_HALF_LIFE_DAYS': 1}
+        title, reviews = self.setup_reviews([4])
+        Review.objects.filter(pk=reviews[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=5000)
+        )
+        Title.objects.filter(pk=title.pk).refresh_rating()
+        Review.objects.create(
+            title=title, text='Отзыв', score=8,
+            author=User.objects.create(username='new', email='n@yamdb.fake'),
+        )
+        stats = TitleStats.objects.get(title=title)
+        assert 0 < stats.recent_weight <= stats.count, (
+            'Проверьте, что суммы весов не растут со временем'
+        )
+        assert stats.recent_average == 8.0
+
+    def test_sums_decay_from_last_update(self, settings):
+        settings.REVIEW_STATS = {'RECENT_HALF_LIFE_DAYS': 10}
+        title, _ = self.setup_reviews([2])
+        stats = TitleStats.objects.get(title=title)
+        TitleStats.objects.filter(title=title).update(
+            recent_anchor=stats.recent_anchor - 10 * 86400
+        )
+        Review.objects.create(
+            title=title, text='Отзыв', score=8,
+            author=User.objects.create(username='new', email='n@yamdb.fake'),
+        )
+        stats = TitleStats.objects.get(title=title)
+        assert stats.recent_weight == pytest.approx(1.5, rel=1e-3)
+        assert stats.recent_average == pytest.approx(6.0, rel=1e-3)